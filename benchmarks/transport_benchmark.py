@@ -0,0 +1,150 @@
+'''
+Compares the throughput of the HTTP transports against a local stand-in for the
+Shrimpy API.
+
+    python benchmarks/transport_benchmark.py --requests 2000 --threads 16
+
+The HTTP/1.1 transports are measured against a keep-alive stand-in server. If
+the `h2` package is installed, HttpxTransport is also measured over HTTP/2 against
+a second stand-in server, using HTTP/2 without TLS. The httpx transports are
+skipped if httpx is not installed.
+
+Both stand-ins answer immediately from the loopback interface. Latency and TLS
+costs of the real API, where HTTP/2 multiplexing matters most, are not part of
+the numbers.
+'''
+import argparse
+import base64
+import importlib.util
+import os
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import shrimpy
+
+
+TICKER = b'[{"name":"Bitcoin","symbol":"BTC","priceUsd":"3700.0089335","priceBtc":"1"}]'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, delayed ACKs would stall each response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(TICKER)))
+        self.end_headers()
+        self.wfile.write(TICKER)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInH2Handler(socketserver.BaseRequestHandler):
+    '''
+    Answers every HTTP/2 stream of a connection without TLS. Requires `h2`.
+    '''
+
+    def handle(self):
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        connection = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        connection.initiate_connection()
+        self.request.sendall(connection.data_to_send())
+        while True:
+            data = self.request.recv(65535)
+            if not data:
+                return
+
+            for event in connection.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    is_head = dict(event.headers).get(b':method') == b'HEAD'
+                    connection.send_headers(
+                        event.stream_id,
+                        [
+                            (':status', '200'),
+                            ('content-type', 'application/json'),
+                            ('content-length', '0' if is_head else str(len(TICKER)))
+                        ],
+                        end_stream=is_head
+                    )
+                    if not is_head:
+                        connection.send_data(event.stream_id, TICKER, end_stream=True)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            self.request.sendall(connection.data_to_send())
+
+
+def create_transports(threads, has_h2_server):
+    transports = [
+        ('requests (default pool)', 'http/1.1', lambda: shrimpy.RequestsTransport()),
+        ('requests (pool_maxsize={})'.format(threads), 'http/1.1', lambda: shrimpy.RequestsTransport(pool_maxsize=threads)),
+    ]
+    if importlib.util.find_spec('httpx') is not None:
+        transports.append(('httpx http/1.1', 'http/1.1', lambda: shrimpy.HttpxTransport(http2=False)))
+        if has_h2_server:
+            transports.append(('httpx http/2', 'h2', lambda: shrimpy.HttpxTransport(http1=False)))
+
+    return transports
+
+
+def start_server(server):
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return 'http://127.0.0.1:{}/v1/'.format(server.server_address[1])
+
+
+def run(transport, url, request_count, threads, warm):
+    secret = base64.b64encode(b'benchmark').decode('ascii')
+    client = shrimpy.ShrimpyApiClient('benchmark', secret, transport=transport)
+    client.url = url
+    if warm:
+        client.warm_connections(threads)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: client.get_ticker('binance'), range(request_count)))
+    elapsed = time.perf_counter() - started
+
+    transport.close()
+    return request_count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+
+    servers = {'http/1.1': ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)}
+    if importlib.util.find_spec('h2') is not None:
+        servers['h2'] = socketserver.ThreadingTCPServer(('127.0.0.1', 0), StandInH2Handler)
+    urls = {protocol: start_server(server) for protocol, server in servers.items()}
+
+    try:
+        for name, protocol, create_transport in create_transports(args.threads, 'h2' in servers):
+            for warm in (False, True):
+                throughput = run(create_transport(), urls[protocol], args.requests, args.threads, warm)
+                print('{:<32} warm={:<5} {:>8.0f} requests/s'.format(name, str(warm), throughput))
+    finally:
+        for server in servers.values():
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
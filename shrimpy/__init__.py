@@ -1,2 +1,69 @@
-from shrimpy.shrimpy_api_client import *
-from shrimpy.shrimpy_ws_client import *
+'''
+Public names are resolved lazily so that importing the package stays cheap.
+Submodules, and their dependencies such as `requests` or `websockets`, are only
+imported the first time one of their names is accessed.
+'''
+import importlib
+
+
+_LAZY_ATTRIBUTES = {
+    # REST
+    'ShrimpyApiClient': 'shrimpy.shrimpy_api_client',
+    'RequestsTransport': 'shrimpy.transport',
+    'HttpxTransport': 'shrimpy.transport',
+    'AuthProvider': 'shrimpy.auth_provider',
+    'get_auth_headers': 'shrimpy.auth_provider',
+    'Allocation': 'shrimpy.allocation',
+    'Strategy': 'shrimpy.strategy',
+    'StaticStrategy': 'shrimpy.strategy',
+    'DynamicStrategy': 'shrimpy.strategy',
+
+    # Websocket
+    'ShrimpyWsClient': 'shrimpy.shrimpy_ws_client',
+    'ConnectionFailureException': 'shrimpy.shrimpy_ws_client',
+    'ShrimpyConnectionClosed': 'shrimpy.shrimpy_ws_client',
+    'InvalidSubscriptionException': 'shrimpy.shrimpy_ws_client',
+    'ShrimpyWsException': 'shrimpy.shrimpy_ws_client',
+    'ProcessHandlerPool': 'shrimpy.ws_workers',
+    'HandlerWorkerException': 'shrimpy.ws_workers',
+
+    # Models
+    'ResponseModel': 'shrimpy.models',
+    'Balance': 'shrimpy.models',
+    'LimitOrder': 'shrimpy.models',
+    'Trade': 'shrimpy.models',
+    'Fill': 'shrimpy.models',
+    'TradeStatus': 'shrimpy.models',
+    'Ticker': 'shrimpy.models',
+    'Candle': 'shrimpy.models',
+    'decimal_number': 'shrimpy.models',
+
+    # Utilities
+    'PriceIndex': 'shrimpy.price_index',
+    'OrderTracker': 'shrimpy.order_tracker',
+    'CandleBuilder': 'shrimpy.candle_builder',
+    'CANDLE_INTERVALS': 'shrimpy.candle_builder',
+    'BalanceHistoryCache': 'shrimpy.balance_history',
+    'TenantMirror': 'shrimpy.tenant_mirror',
+    'encode_orderbooks': 'shrimpy.orderbook_codec',
+    'OrderBookDecoder': 'shrimpy.orderbook_codec',
+    'InvalidOrderBookDataException': 'shrimpy.orderbook_codec',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+    value = getattr(importlib.import_module(module_name), name)
+    # Cache the value so later lookups skip __getattr__
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -3,10 +3,14 @@ import hashlib
 import time
 import base64
 import threading
-from requests.auth import AuthBase
 
 
-class AuthProvider(AuthBase):
+class AuthProvider():
+    '''
+    Signs requests for the Shrimpy Developer API. Instances are callables that can
+    be passed as `auth` to `requests`, which accepts any callable.
+    '''
+
     def __init__(self, api_key, secret_key):
         self.api_key = api_key
         self.secret_key = secret_key
@@ -15,13 +19,16 @@ class AuthProvider(AuthBase):
 
 
     def __call__(self, request):
-        nonce = self._get_nonce()
-        message = ''.join([request.path_url, request.method, str(nonce), (request.body or '')])
-        headers = get_auth_headers(nonce, message, self.api_key, self.secret_key)
+        headers = self.get_headers(request.path_url, request.method, request.body)
         request.headers.update(headers)
 
         return request
 
+    def get_headers(self, path_url, method, body=None):
+        nonce = self._get_nonce()
+        message = ''.join([path_url, method, str(nonce), (body or '')])
+        return get_auth_headers(nonce, message, self.api_key, self.secret_key)
+
     def _get_nonce(self):
         new_nonce = int(time.time() *  1000)
         with self.nonce_lock:
@@ -0,0 +1,178 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from shrimpy.utils import parse_time, format_time
+
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+
+class _AccountHistory():
+
+    __slots__ = ('times', 'usd_values', 'btc_values', 'downsampled_until')
+
+    def __init__(self, tier_count):
+        self.times = array('d')
+        self.usd_values = array('d')
+        self.btc_values = array('d')
+        # Per resolution tier, the number of leading points already downsampled to it
+        self.downsampled_until = [0] * tier_count
+
+
+class BalanceHistoryCache():
+    '''
+    The Balance History Cache keeps the total balance history of every account it
+    has seen, so that repeated range queries are answered locally.
+
+    Each refresh only requests the points newer than the last cached one through the
+    `start_time` parameter of `get_total_balance_history`. Old points are downsampled
+    according to `resolutions`, a sequence of (age, resolution) pairs in seconds: once
+    a point is older than `age`, only the last point per `resolution` is kept.
+
+    `get_balance` responses with a `date` are cached as well, once the date is
+    older than the newest point of the account history or than `snapshot_delay`
+    seconds. More recent dates return the latest snapshot so far, which can still
+    change.
+    '''
+
+    def __init__(self, client, resolutions=((7 * DAY, HOUR), (90 * DAY, DAY)), snapshot_delay=DAY):
+        self.client = client
+        self.resolutions = sorted(resolutions)
+        self.snapshot_delay = snapshot_delay
+        self.histories = {}
+        self.balance_snapshots = {}
+        self.lock = threading.Lock()
+
+    def refresh(self, user_id, exchange_account_id):
+        '''
+            Fetches the points added since the last refresh of the account
+        '''
+        key = (user_id, exchange_account_id)
+        with self.lock:
+            history = self.histories.get(key)
+            start_time = None
+            if (history is not None) and history.times:
+                start_time = format_time(history.times[-1] + 0.001)
+
+        response = self.client.get_total_balance_history(user_id, exchange_account_id, start_time=start_time)
+        if not isinstance(response, list):
+            # Error responses leave the cached history untouched
+            return
+
+        points = sorted(
+            (parse_time(p['date']), float(p['usdValue']), float(p['btcValue']))
+            for p in response
+        )
+        with self.lock:
+            history = self.histories.get(key)
+            if history is None:
+                history = self.histories[key] = _AccountHistory(len(self.resolutions))
+
+            for timestamp, usd_value, btc_value in points:
+                if history.times and (timestamp <= history.times[-1]):
+                    continue
+                history.times.append(timestamp)
+                history.usd_values.append(usd_value)
+                history.btc_values.append(btc_value)
+
+            self._downsample(history, time.time())
+
+    def refresh_all(self):
+        with self.lock:
+            keys = list(self.histories.keys())
+
+        for user_id, exchange_account_id in keys:
+            self.refresh(user_id, exchange_account_id)
+
+    def get_total_balance_history(self, user_id, exchange_account_id, start_time=None, end_time=None, refresh=True):
+        '''
+            Returns the cached history between `start_time` and `end_time` in the format of
+            `get_total_balance_history`, refreshing the account first unless `refresh` is False
+        '''
+        if refresh or ((user_id, exchange_account_id) not in self.histories):
+            self.refresh(user_id, exchange_account_id)
+
+        with self.lock:
+            history = self.histories.get((user_id, exchange_account_id))
+            if history is None:
+                return []
+
+            start = 0 if start_time is None else bisect_left(history.times, parse_time(start_time))
+            end = len(history.times) if end_time is None else bisect_right(history.times, parse_time(end_time))
+            return [
+                {
+                    'date': format_time(history.times[i]),
+                    'usdValue': history.usd_values[i],
+                    'btcValue': history.btc_values[i]
+                }
+                for i in range(start, end)
+            ]
+
+    def get_balance(self, user_id, exchange_account_id, date=None):
+        '''
+            Same as `ShrimpyApiClient.get_balance`, but snapshots of past dates are only
+            requested once
+        '''
+        if date is None:
+            return self.client.get_balance(user_id, exchange_account_id)
+
+        key = (user_id, exchange_account_id, date)
+        with self.lock:
+            snapshot = self.balance_snapshots.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        snapshot = self.client.get_balance(user_id, exchange_account_id, date=date)
+        if isinstance(snapshot, dict) and ('balances' in snapshot) and self._is_settled(user_id, exchange_account_id, date):
+            with self.lock:
+                self.balance_snapshots[key] = snapshot
+
+        return snapshot
+
+    def _is_settled(self, user_id, exchange_account_id, date):
+        settled_until = time.time() - self.snapshot_delay
+        with self.lock:
+            history = self.histories.get((user_id, exchange_account_id))
+            if (history is not None) and history.times:
+                settled_until = max(settled_until, history.times[-1])
+
+        return parse_time(date) < settled_until
+
+    def _downsample(self, history, now):
+        '''
+        Keeps the last point of every resolution bucket for points older than the
+        corresponding age. Recent points are kept as received.
+
+        Only the points that crossed the age of a tier since the last refresh are
+        processed, so the cost doesn't grow with the length of the history.
+        '''
+        for tier, (age, resolution) in enumerate(self.resolutions):
+            start = history.downsampled_until[tier]
+            end = bisect_right(history.times, now - age, lo=start)
+            if start >= end:
+                continue
+
+            times = history.times
+            # Checked before removing points, which shortens the history
+            reaches_newest = end == len(times)
+            kept = [
+                i for i in range(start, end)
+                # A later point in the same bucket replaces this one
+                if (i + 1 == len(times)) or ((times[i] // resolution) != (times[i + 1] // resolution))
+            ]
+            removed = (end - start) - len(kept)
+            if removed:
+                history.times[start:end] = array('d', (times[i] for i in kept))
+                history.usd_values[start:end] = array('d', (history.usd_values[i] for i in kept))
+                history.btc_values[start:end] = array('d', (history.btc_values[i] for i in kept))
+
+            downsampled_until = start + len(kept)
+            if reaches_newest:
+                # Later points may still fall into the bucket of the newest point
+                downsampled_until -= 1
+            history.downsampled_until[tier] = downsampled_until
+            # Finer tiers already covered these points, their indexes shift down
+            for finer_tier in range(tier):
+                history.downsampled_until[finer_tier] -= removed
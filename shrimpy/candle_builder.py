@@ -0,0 +1,245 @@
+import threading
+import time
+from array import array
+from shrimpy.utils import parse_time, format_time
+
+
+CANDLE_INTERVALS = {
+    '1m': 60,
+    '5m': 5 * 60,
+    '15m': 15 * 60,
+    '1h': 60 * 60,
+    '6h': 6 * 60 * 60,
+    '1d': 24 * 60 * 60
+}
+
+
+class _CandleSeries():
+    '''
+    Ring buffer of contiguous candles for a single pair and interval. Every column
+    is preallocated, so updating the current candle never allocates.
+    '''
+
+    __slots__ = (
+        'seconds', 'capacity', 'head', 'count', 'seeded_until',
+        'times', 'opens', 'highs', 'lows', 'closes', 'volumes', 'quote_volumes'
+    )
+
+    def __init__(self, seconds, capacity):
+        self.seconds = seconds
+        self.capacity = capacity
+        self.head = 0
+        self.count = 0
+        self.seeded_until = 0
+        self.times = array('d', bytes(8 * capacity))
+        self.opens = array('d', bytes(8 * capacity))
+        self.highs = array('d', bytes(8 * capacity))
+        self.lows = array('d', bytes(8 * capacity))
+        self.closes = array('d', bytes(8 * capacity))
+        self.volumes = array('d', bytes(8 * capacity))
+        self.quote_volumes = array('d', bytes(8 * capacity))
+
+    def add_trade(self, timestamp, price, quantity):
+        i = self._get_index(timestamp - timestamp % self.seconds, price)
+        if i is None:
+            return
+
+        if self.volumes[i] == 0:
+            # First trade of a candle that was filled in for a gap
+            self._fill(i, price)
+
+        if price > self.highs[i]:
+            self.highs[i] = price
+        if price < self.lows[i]:
+            self.lows[i] = price
+        if i == self.head:
+            self.closes[i] = price
+        self.volumes[i] += quantity
+        self.quote_volumes[i] += price * quantity
+
+    def set_candle(self, start, open_price, high, low, close, volume, quote_volume):
+        i = self._get_index(start, open_price)
+        if i is None:
+            return
+
+        self.opens[i] = open_price
+        self.highs[i] = high
+        self.lows[i] = low
+        self.closes[i] = close
+        self.volumes[i] = volume
+        self.quote_volumes[i] = quote_volume
+
+    def get(self, offset):
+        '''
+            Returns the candle `offset` intervals before the current one
+        '''
+        if offset >= self.count:
+            return None
+
+        i = (self.head - offset) % self.capacity
+        return {
+            'open': self.opens[i],
+            'high': self.highs[i],
+            'low': self.lows[i],
+            'close': self.closes[i],
+            'volume': self.volumes[i],
+            'quoteVolume': self.quote_volumes[i],
+            'time': format_time(self.times[i])
+        }
+
+    def _get_index(self, start, price):
+        '''
+        Returns the buffer index of the candle starting at `start`, advancing the ring
+        when the candle is newer than the current one. Intervals without trades are
+        filled with flat candles at the previous close so that the buffer stays
+        contiguous. Candles that have fallen out of the buffer return None.
+        '''
+        if self.count == 0:
+            self._start_candle(self.head, start, price)
+            self.count = 1
+            return self.head
+
+        current_start = self.times[self.head]
+        if start <= current_start:
+            offset = int((current_start - start) // self.seconds)
+            if offset >= self.count:
+                return None
+            return (self.head - offset) % self.capacity
+
+        missing = int((start - current_start) // self.seconds)
+        close = self.closes[self.head]
+        for step in range(max(1, missing - self.capacity + 1), missing):
+            self._advance()
+            self._start_candle(self.head, current_start + step * self.seconds, close)
+
+        self._advance()
+        self._start_candle(self.head, start, price)
+        return self.head
+
+    def _fill(self, i, price):
+        '''
+        Resets the candle at `i` to a flat candle at `price`, along with the gap
+        filling candles that follow it, which start from its close
+        '''
+        while True:
+            self.opens[i] = price
+            self.highs[i] = price
+            self.lows[i] = price
+            self.closes[i] = price
+            if i == self.head:
+                return
+
+            i = (i + 1) % self.capacity
+            if self.volumes[i] != 0:
+                return
+
+    def _advance(self):
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def _start_candle(self, i, start, price):
+        self.times[i] = start
+        self.opens[i] = price
+        self.highs[i] = price
+        self.lows[i] = price
+        self.closes[i] = price
+        self.volumes[i] = 0
+        self.quote_volumes[i] = 0
+
+
+class CandleBuilder():
+    '''
+    The Candle Builder aggregates the websocket `trade` channel into candles for
+    several intervals and pairs at once, removing the need to poll `get_candles`.
+
+    Pass `handle_trade` as the handler of `trade` subscriptions. Candles are kept in
+    ring buffers of `history` entries per pair and interval, and can be seeded from
+    `get_candles` with `seed` before subscribing. Candles are returned in the format
+    of `get_candles`, with numeric values as floats. `btcVolume` and `usdVolume`
+    are not included, trades only carry the volumes in the pair's own currencies.
+    '''
+
+    def __init__(self, intervals=('1m', '5m', '15m', '1h', '1d'), history=500):
+        self.intervals = list(intervals)
+        self.history = history
+        self.series = {}
+        self.lock = threading.Lock()
+
+        for interval in self.intervals:
+            if interval not in CANDLE_INTERVALS:
+                raise ValueError('Unsupported candle interval: {}'.format(interval))
+
+    def seed(self, client, exchange, base_trading_symbol, quote_trading_symbol):
+        '''
+            Loads the candles of every interval from `get_candles`
+        '''
+        pair = '{}-{}'.format(base_trading_symbol, quote_trading_symbol)
+        seeded_until = time.time()
+        for interval in self.intervals:
+            candles = client.get_candles(exchange, base_trading_symbol, quote_trading_symbol, interval)
+            candles = sorted(candles, key=lambda c: parse_time(c['time']))
+            with self.lock:
+                series = self._get_series(exchange, pair, interval)
+                for candle in candles:
+                    series.set_candle(
+                        parse_time(candle['time']),
+                        float(candle['open']),
+                        float(candle['high']),
+                        float(candle['low']),
+                        float(candle['close']),
+                        float(candle['volume']),
+                        float(candle.get('quoteVolume') or 0)
+                    )
+                # Trades up to now are already part of the seeded candles
+                series.seeded_until = seeded_until
+
+    def handle_trade(self, message):
+        '''
+            Websocket handler for the `trade` channel
+        '''
+        exchange = message['exchange']
+        pair = message['pair']
+        trades = [
+            (parse_time(t['time']), float(t['price']), float(t['quantity']))
+            for t in message.get('content', [])
+        ]
+        trades.sort(key=lambda t: t[0])
+
+        with self.lock:
+            for interval in self.intervals:
+                series = self._get_series(exchange, pair, interval)
+                for timestamp, price, quantity in trades:
+                    if timestamp >= series.seeded_until:
+                        series.add_trade(timestamp, price, quantity)
+
+    def current(self, exchange, pair, interval):
+        '''
+            Returns the candle currently being built, or None if no trade was seen yet
+        '''
+        with self.lock:
+            series = self.series.get(self._get_key(exchange, pair, interval))
+            return None if series is None else series.get(0)
+
+    def last(self, exchange, pair, interval, count):
+        '''
+            Returns up to the last `count` candles, oldest first, including the current one
+        '''
+        with self.lock:
+            series = self.series.get(self._get_key(exchange, pair, interval))
+            if series is None:
+                return []
+
+            count = min(count, series.count)
+            return [series.get(offset) for offset in range(count - 1, -1, -1)]
+
+    def _get_series(self, exchange, pair, interval):
+        key = self._get_key(exchange, pair, interval)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = _CandleSeries(CANDLE_INTERVALS[interval], self.history)
+
+        return series
+
+    def _get_key(self, exchange, pair, interval):
+        return (exchange.lower(), pair.lower(), interval)
@@ -0,0 +1,262 @@
+class _Field():
+    '''
+    Descriptor for a single response field. The value is kept exactly as it was
+    received in the `raw` slot and only decoded the first time the attribute is
+    read, after which it is cached in the `cache` slot. Keys that were absent from
+    the response leave the raw slot unset.
+    '''
+
+    def __init__(self, api_key, decoder):
+        self.api_key = api_key
+        self.decoder = decoder
+        self.raw = None
+        self.cache = None
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        if self.decoder is None:
+            return self.get_raw(instance)
+
+        try:
+            return self.cache.__get__(instance, owner)
+        except AttributeError:
+            value = self.get_raw(instance)
+            if value is not None:
+                value = self.decoder(value)
+            self.cache.__set__(instance, value)
+            return value
+
+    def get_raw(self, instance, default=None):
+        try:
+            return self.raw.__get__(instance, type(instance))
+        except AttributeError:
+            return default
+
+
+class _ModelMeta(type):
+    '''
+    Turns the (attribute, api key, decoder) triples declared in `_fields` into
+    descriptors backed by slots, so every model shares one layout instead of a dict
+    per object. Subclasses that don't declare `_fields` inherit the layout of their
+    parent, those that do extend it with their own fields.
+    '''
+
+    def __new__(mcs, name, bases, namespace):
+        fields = namespace.get('_fields')
+        if fields is None:
+            namespace.setdefault('__slots__', ())
+            return super(_ModelMeta, mcs).__new__(mcs, name, bases, namespace)
+
+        declared = {attribute for attribute, _, _ in fields}
+        inherited_fields = []
+        for base in bases:
+            for field in getattr(base, '_fields', ()):
+                if (field[0] not in declared) and (field not in inherited_fields):
+                    inherited_fields.append(field)
+
+        slots = list(namespace.get('__slots__', ()))
+        descriptors = []
+        for attribute, api_key, decoder in fields:
+            descriptor = namespace[attribute] = _Field(api_key, decoder)
+            descriptors.append((attribute, descriptor))
+            slots.append('_raw_' + attribute)
+            if decoder is not None:
+                slots.append('_cached_' + attribute)
+        namespace['__slots__'] = tuple(slots)
+
+        cls = super(_ModelMeta, mcs).__new__(mcs, name, bases, namespace)
+        for attribute, descriptor in descriptors:
+            descriptor.raw = cls.__dict__['_raw_' + attribute]
+            if descriptor.decoder is not None:
+                descriptor.cache = cls.__dict__['_cached_' + attribute]
+        # Inherited fields keep the descriptors, and slots, of the class declaring them
+        cls._fields = tuple(inherited_fields) + tuple(fields)
+        cls._descriptors = tuple(getattr(cls, attribute) for attribute, _, _ in cls._fields)
+
+        return cls
+
+
+# Marks keys that were not present in the response
+_ABSENT = object()
+
+
+def decimal_number(value):
+    '''
+    Decodes numeric strings, and numbers the API already sent as such, to floats
+    '''
+    if value is None or value == '':
+        return None
+
+    return float(value)
+
+
+class ResponseModel(metaclass=_ModelMeta):
+    '''
+    Compact, read-only view of a single API response object.
+
+    Every field is stored in a slot exactly as received and numeric fields are
+    parsed lazily, so keeping large working sets of responses costs less than the
+    equivalent nested dicts.
+    '''
+
+    _fields = ()
+
+    # Responses may contain lists, which are not hashable
+    __hash__ = None
+
+    @classmethod
+    def from_api(cls, response):
+        model = cls.__new__(cls)
+        for descriptor in cls._descriptors:
+            value = response.get(descriptor.api_key, _ABSENT)
+            if value is not _ABSENT:
+                descriptor.raw.__set__(model, value)
+
+        return model
+
+    @classmethod
+    def from_api_list(cls, responses):
+        return [cls.from_api(response) for response in responses]
+
+    def get_api_format(self):
+        api_format = {}
+        for descriptor in self._descriptors:
+            value = descriptor.get_raw(self, _ABSENT)
+            if value is not _ABSENT:
+                api_format[descriptor.api_key] = value
+
+        return api_format
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.get_api_format() == other.get_api_format()
+
+    def __repr__(self):
+        fields = ', '.join(
+            '{}={!r}'.format(attribute, descriptor.get_raw(self))
+            for (attribute, _, _), descriptor in zip(self._fields, self._descriptors)
+            if descriptor.get_raw(self, _ABSENT) is not _ABSENT
+        )
+        return '{}({})'.format(type(self).__name__, fields)
+
+
+class Balance(ResponseModel):
+    '''Balance entry returned by `get_balance` and the `changes` of a trade'''
+    __slots__ = ()
+    _fields = (
+        ('symbol', 'symbol', None),
+        ('native_value', 'nativeValue', decimal_number),
+        ('btc_value', 'btcValue', decimal_number),
+        ('usd_value', 'usdValue', decimal_number),
+    )
+
+
+class LimitOrder(ResponseModel):
+    '''Order returned by `list_open_orders` and `get_limit_order_status`'''
+    __slots__ = ()
+    _fields = (
+        ('id', 'id', None),
+        ('base_symbol', 'baseSymbol', None),
+        ('quote_symbol', 'quoteSymbol', None),
+        ('amount', 'amount', decimal_number),
+        ('price', 'price', decimal_number),
+        ('side', 'side', None),
+        ('time_in_force', 'timeInForce', None),
+        ('status', 'status', None),
+        ('cancel_requested', 'cancelRequested', None),
+        ('success', 'success', None),
+        ('error_code', 'errorCode', None),
+        ('error_message', 'errorMessage', None),
+        ('exchange_api_errors', 'exchangeApiErrors', None),
+    )
+
+
+class Trade(ResponseModel):
+    '''Trade returned by `list_active_trades` and `get_trade_status`'''
+    __slots__ = ()
+    _fields = (
+        ('id', 'id', None),
+        ('from_symbol', 'fromSymbol', None),
+        ('to_symbol', 'toSymbol', None),
+        ('amount', 'amount', decimal_number),
+        ('status', 'status', None),
+        ('success', 'success', None),
+        ('error_code', 'errorCode', None),
+        ('error_message', 'errorMessage', None),
+        ('exchange_api_errors', 'exchangeApiErrors', None),
+        ('smart_routing', 'smartRouting', None),
+        ('max_spread_percent', 'maxSpreadPercent', decimal_number),
+        ('max_slippage_percent', 'maxSlippagePercent', decimal_number),
+        ('triggered_max_spread', 'triggeredMaxSpread', None),
+        ('triggered_max_slippage', 'triggeredMaxSlippage', None),
+    )
+
+
+class Fill(ResponseModel):
+    '''Fill entry of a trade status'''
+    __slots__ = ()
+    _fields = (
+        ('base_amount', 'baseAmount', decimal_number),
+        ('base_symbol', 'baseSymbol', None),
+        ('quote_amount', 'quoteAmount', decimal_number),
+        ('quote_symbol', 'quoteSymbol', None),
+        ('price', 'price', decimal_number),
+        ('side', 'side', None),
+        ('btc_value', 'btcValue', decimal_number),
+        ('usd_value', 'usdValue', decimal_number),
+    )
+
+
+class TradeStatus():
+    '''Response of `get_trade_status`: the trade along with its balance changes and fills'''
+    __slots__ = ('trade', 'changes', 'fills')
+
+    def __init__(self, trade, changes, fills):
+        self.trade = trade
+        self.changes = changes
+        self.fills = fills
+
+    @classmethod
+    def from_api(cls, response):
+        return cls(
+            Trade.from_api(response['trade']),
+            Balance.from_api_list(response.get('changes') or []),
+            Fill.from_api_list(response.get('fills') or [])
+        )
+
+    def get_api_format(self):
+        return {
+            'trade': self.trade.get_api_format(),
+            'changes': [c.get_api_format() for c in self.changes],
+            'fills': [f.get_api_format() for f in self.fills]
+        }
+
+
+class Ticker(ResponseModel):
+    '''Row returned by `get_ticker`'''
+    __slots__ = ()
+    _fields = (
+        ('name', 'name', None),
+        ('symbol', 'symbol', None),
+        ('price_usd', 'priceUsd', decimal_number),
+        ('price_btc', 'priceBtc', decimal_number),
+        ('percent_change_24h_usd', 'percentChange24hUsd', decimal_number),
+        ('last_updated', 'lastUpdated', None),
+    )
+
+
+class Candle(ResponseModel):
+    '''Candle returned by `get_candles`'''
+    __slots__ = ()
+    _fields = (
+        ('open', 'open', decimal_number),
+        ('high', 'high', decimal_number),
+        ('low', 'low', decimal_number),
+        ('close', 'close', decimal_number),
+        ('volume', 'volume', decimal_number),
+        ('quote_volume', 'quoteVolume', decimal_number),
+        ('btc_volume', 'btcVolume', decimal_number),
+        ('usd_volume', 'usdVolume', decimal_number),
+        ('time', 'time', None),
+    )
@@ -0,0 +1,238 @@
+import threading
+import time
+
+
+# Statuses after which an item doesn't change anymore
+TERMINAL_STATUSES = frozenset(('completed', 'cancelled', 'failed', 'unknown'))
+
+
+class _TrackedAccount():
+
+    def __init__(self, user_id, exchange_account_id, interval):
+        self.user_id = user_id
+        self.exchange_account_id = exchange_account_id
+        self.trades = {}
+        self.orders = {}
+        self.tracked_at = {}
+        self.status_failures = {}
+        self.interval = interval
+        self.next_poll = 0
+
+
+class OrderTracker():
+    '''
+    The Order Tracker follows the status of trades and limit orders without
+    requesting each of them individually.
+
+    Every cycle, each account with tracked items is polled once through
+    `list_active_trades` and `list_open_orders`. Only items that are not
+    listed are fetched with `get_trade_status` or `get_limit_order_status`. Once
+    their status is one of `TERMINAL_STATUSES` they stop being tracked, otherwise,
+    e.g. for orders that are not listed yet, they are fetched again next cycle.
+    Accounts with recent changes or young items are polled every `min_interval`
+    seconds, quiet accounts back off to `max_interval`.
+
+    If the final state of an item still can't be fetched after
+    `max_status_failures` attempts, e.g. because the id is unknown, a last event
+    with the status 'unknown' is sent and the item stops being tracked.
+
+    Status changes are sent to the handlers as dicts:
+
+        {
+            'type': 'trade' or 'order',
+            'id': ...,
+            'userId': ...,
+            'exchangeAccountId': ...,
+            'previousStatus': ...,
+            'status': ...,
+            'data': <trade or order as returned by the API>
+        }
+    '''
+
+    def __init__(self, client, handler=None, min_interval=1, max_interval=60, max_status_failures=3):
+        self.client = client
+        self.handlers = [] if handler is None else [handler]
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_status_failures = max_status_failures
+        self.accounts = {}
+        self.lock = threading.Lock()
+        self.poll_thread = None
+        self.stop_event = threading.Event()
+
+    def add_handler(self, handler):
+        self.handlers.append(handler)
+
+    def track_trade(self, user_id, exchange_account_id, trade_id, status=None):
+        self._track(user_id, exchange_account_id, 'trades', trade_id, status)
+
+    def track_order(self, user_id, exchange_account_id, order_id, status=None):
+        self._track(user_id, exchange_account_id, 'orders', order_id, status)
+
+    def untrack_trade(self, user_id, exchange_account_id, trade_id):
+        self._untrack(user_id, exchange_account_id, 'trades', trade_id)
+
+    def untrack_order(self, user_id, exchange_account_id, order_id):
+        self._untrack(user_id, exchange_account_id, 'orders', order_id)
+
+    def poll(self):
+        '''
+            Polls every account that is due and returns the number of seconds until the
+            next account is due
+        '''
+        now = time.time()
+        with self.lock:
+            due_accounts = [a for a in self.accounts.values() if a.next_poll <= now]
+
+        for account in due_accounts:
+            changed = self._poll_account(account)
+            self._schedule(account, changed)
+
+        with self.lock:
+            if not self.accounts:
+                return self.max_interval
+            next_poll = min(a.next_poll for a in self.accounts.values())
+
+        return max(0, next_poll - time.time())
+
+    def start(self):
+        self.stop_event.clear()
+        self.poll_thread = threading.Thread(target=self._run_poll_thread)
+        self.poll_thread.daemon = True
+        self.poll_thread.start()
+
+    def stop(self):
+        if self.poll_thread is None:
+            return
+
+        self.stop_event.set()
+        self.poll_thread.join()
+        self.poll_thread = None
+
+    def _run_poll_thread(self):
+        while not self.stop_event.is_set():
+            try:
+                wait_time = self.poll()
+            except Exception:
+                # Failed polls are retried on the next cycle
+                wait_time = self.min_interval
+            self.stop_event.wait(wait_time)
+
+    def _track(self, user_id, exchange_account_id, kind, item_id, status):
+        key = (user_id, exchange_account_id)
+        with self.lock:
+            account = self.accounts.get(key)
+            if account is None:
+                account = self.accounts[key] = _TrackedAccount(user_id, exchange_account_id, self.min_interval)
+
+            getattr(account, kind)[item_id] = status
+            account.tracked_at[item_id] = time.time()
+            account.interval = self.min_interval
+            account.next_poll = min(account.next_poll, time.time() + self.min_interval)
+
+    def _untrack(self, user_id, exchange_account_id, kind, item_id):
+        key = (user_id, exchange_account_id)
+        with self.lock:
+            account = self.accounts.get(key)
+            if account is None:
+                return
+
+            getattr(account, kind).pop(item_id, None)
+            account.tracked_at.pop(item_id, None)
+            account.status_failures.pop(item_id, None)
+            if (not account.trades) and (not account.orders):
+                del self.accounts[key]
+
+    def _poll_account(self, account):
+        changed = False
+        if account.trades:
+            changed |= self._poll_items(
+                account,
+                'trade',
+                account.trades,
+                self.client.list_active_trades,
+                self.client.get_trade_status
+            )
+
+        if account.orders:
+            changed |= self._poll_items(
+                account,
+                'order',
+                account.orders,
+                self.client.list_open_orders,
+                self.client.get_limit_order_status
+            )
+
+        return changed
+
+    def _poll_items(self, account, item_type, tracked, list_items, get_item_status):
+        listing = list_items(account.user_id, account.exchange_account_id)
+        if not isinstance(listing, list):
+            # Error responses are retried on the next cycle
+            return False
+
+        listed = {item['id']: item for item in listing}
+        changed = False
+        with self.lock:
+            tracked_items = list(tracked.items())
+
+        for item_id, previous_status in tracked_items:
+            item = listed.get(item_id)
+            is_listed = item is not None
+            if not is_listed:
+                # Not active, the state must be fetched individually
+                response = get_item_status(account.user_id, account.exchange_account_id, item_id)
+                item = response.get(item_type) if isinstance(response, dict) else None
+                if item is None:
+                    with self.lock:
+                        failures = account.status_failures.get(item_id, 0) + 1
+                        account.status_failures[item_id] = failures
+                    if failures < self.max_status_failures:
+                        continue
+
+                    # Give up on ids whose state can't be fetched, e.g. unknown ids
+                    item = {'id': item_id, 'status': 'unknown'}
+                else:
+                    with self.lock:
+                        account.status_failures.pop(item_id, None)
+
+            status = item.get('status')
+            if status != previous_status:
+                changed = True
+                with self.lock:
+                    if item_id in tracked:
+                        tracked[item_id] = status
+                self._emit(item_type, account, item_id, previous_status, status, item)
+
+            if (not is_listed) and (status in TERMINAL_STATUSES):
+                self._untrack(account.user_id, account.exchange_account_id, item_type + 's', item_id)
+
+        return changed
+
+    def _schedule(self, account, changed):
+        now = time.time()
+        with self.lock:
+            if changed or (not account.tracked_at):
+                account.interval = self.min_interval
+            else:
+                # Young items are likely to change soon, so they cap the back off
+                youngest_age = now - max(account.tracked_at.values())
+                account.interval = min(
+                    account.interval * 2,
+                    max(self.min_interval, youngest_age / 10),
+                    self.max_interval
+                )
+            account.next_poll = now + account.interval
+
+    def _emit(self, item_type, account, item_id, previous_status, status, item):
+        event = {
+            'type': item_type,
+            'id': item_id,
+            'userId': account.user_id,
+            'exchangeAccountId': account.exchange_account_id,
+            'previousStatus': previous_status,
+            'status': status,
+            'data': item
+        }
+        for handler in self.handlers:
+            handler(event)
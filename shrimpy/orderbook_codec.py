@@ -0,0 +1,265 @@
+import sys
+from array import array
+from bisect import bisect_right
+from struct import Struct
+from shrimpy.utils import parse_time, format_time
+
+
+MAGIC = b'SHOB'
+VERSION = 1
+
+# magic, version, price scale, size scale, record count, keyframe count, index offset
+_HEADER = Struct('<4sBqqIIQ')
+# time in milliseconds, flags, ask level count, bid level count
+_RECORD_HEADER = Struct('<qBII')
+# time in milliseconds, record offset
+_INDEX_ENTRY = Struct('<qQ')
+
+_KEYFRAME = 1
+
+# Fixed point values are stored as signed 64 bit integers
+_MAX_FIXED_POINT = 2 ** 63 - 1
+_DEFAULT_SCALE = 10 ** 8
+
+
+class InvalidOrderBookDataException(Exception):
+    pass
+
+
+def encode_orderbooks(snapshots, price_scale=None, size_scale=None, keyframe_interval=100):
+    '''
+    Encodes a time ordered sequence of `get_historical_orderbooks` snapshots into a
+    compact binary layout.
+
+    Prices and sizes are stored as fixed point integers (value * scale). Scales
+    that aren't given are picked from the data: 10**8, or the largest smaller power
+    of 10 that keeps the largest value within 64 bits. Every `keyframe_interval`
+    snapshots a full book is stored; the snapshots in between only store the levels
+    that changed, with a size of 0 for removed levels.
+    '''
+    if (price_scale is None) or (size_scale is None):
+        snapshots = list(snapshots)
+        levels = [
+            level
+            for snapshot in snapshots
+            for side in ('asks', 'bids')
+            for level in (snapshot['content'].get(side) or [])
+        ]
+        if price_scale is None:
+            price_scale = _pick_scale(level['price'] for level in levels)
+        if size_scale is None:
+            size_scale = _pick_scale(_get_size(level) for level in levels)
+
+    records = []
+    index = []
+    offset = _HEADER.size
+    asks = {}
+    bids = {}
+
+    for count, snapshot in enumerate(snapshots):
+        content = snapshot['content']
+        new_asks = _to_levels(content.get('asks') or [], price_scale, size_scale)
+        new_bids = _to_levels(content.get('bids') or [], price_scale, size_scale)
+        timestamp = int(round(parse_time(snapshot['time']) * 1000))
+
+        is_keyframe = (count % keyframe_interval) == 0
+        if is_keyframe:
+            ask_changes = new_asks
+            bid_changes = new_bids
+            index.append(_INDEX_ENTRY.pack(timestamp, offset))
+        else:
+            ask_changes = _diff_levels(asks, new_asks)
+            bid_changes = _diff_levels(bids, new_bids)
+        asks = new_asks
+        bids = new_bids
+
+        values = array('q')
+        for levels in (ask_changes, bid_changes):
+            for price in sorted(levels):
+                values.append(price)
+                values.append(levels[price])
+        if sys.byteorder != 'little':
+            values.byteswap()
+
+        record = _RECORD_HEADER.pack(
+            timestamp,
+            _KEYFRAME if is_keyframe else 0,
+            len(ask_changes),
+            len(bid_changes)
+        ) + values.tobytes()
+        records.append(record)
+        offset += len(record)
+
+    header = _HEADER.pack(MAGIC, VERSION, price_scale, size_scale, len(records), len(index), offset)
+    return b''.join([header] + records + index)
+
+
+class OrderBookDecoder():
+    '''
+    Rebuilds order books from data produced by `encode_orderbooks`.
+
+    Seeking to a timestamp starts from the nearest preceding keyframe, so only the
+    deltas recorded since that keyframe have to be applied.
+    '''
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        if len(self.data) < _HEADER.size:
+            raise InvalidOrderBookDataException('Order book data is truncated')
+
+        magic, version, self.price_scale, self.size_scale, self.record_count, keyframe_count, index_offset = \
+            _HEADER.unpack_from(self.data, 0)
+        if (magic != MAGIC) or (version != VERSION):
+            raise InvalidOrderBookDataException('Unsupported order book data format')
+        if (index_offset < _HEADER.size) or (index_offset + keyframe_count * _INDEX_ENTRY.size > len(self.data)):
+            raise InvalidOrderBookDataException('Order book data is truncated')
+
+        self._keyframe_times = []
+        self._keyframe_offsets = []
+        for i in range(keyframe_count):
+            timestamp, offset = _INDEX_ENTRY.unpack_from(self.data, index_offset + i * _INDEX_ENTRY.size)
+            if not (_HEADER.size <= offset < index_offset):
+                raise InvalidOrderBookDataException('Order book index is corrupt')
+            self._keyframe_times.append(timestamp)
+            self._keyframe_offsets.append(offset)
+        self._end_offset = index_offset
+
+    def __len__(self):
+        return self.record_count
+
+    def book_at(self, time):
+        '''
+            Returns the last order book recorded at or before `time`, in the format of
+            `get_historical_orderbooks`, or None if `time` precedes the first snapshot
+        '''
+        timestamp = int(round(parse_time(time) * 1000))
+        k = bisect_right(self._keyframe_times, timestamp) - 1
+        if k < 0:
+            return None
+
+        offset = self._keyframe_offsets[k]
+        asks = {}
+        bids = {}
+        book_time = None
+        while offset < self._end_offset:
+            record_time, flags, ask_count, bid_count = self._read_record_header(offset)
+            if record_time > timestamp:
+                break
+
+            offset, ask_changes, bid_changes = self._read_levels(offset, ask_count, bid_count)
+            if flags & _KEYFRAME:
+                asks = ask_changes
+                bids = bid_changes
+            else:
+                _apply_levels(asks, ask_changes)
+                _apply_levels(bids, bid_changes)
+            book_time = record_time
+
+        return self._to_book(book_time, asks, bids)
+
+    def __iter__(self):
+        '''
+            Iterates over every recorded order book in order
+        '''
+        offset = _HEADER.size
+        asks = {}
+        bids = {}
+        while offset < self._end_offset:
+            record_time, flags, ask_count, bid_count = self._read_record_header(offset)
+            offset, ask_changes, bid_changes = self._read_levels(offset, ask_count, bid_count)
+            if flags & _KEYFRAME:
+                asks = ask_changes
+                bids = bid_changes
+            else:
+                _apply_levels(asks, ask_changes)
+                _apply_levels(bids, bid_changes)
+
+            yield self._to_book(record_time, asks, bids)
+
+    def _read_record_header(self, offset):
+        if offset + _RECORD_HEADER.size > self._end_offset:
+            raise InvalidOrderBookDataException('Order book record is truncated')
+
+        return _RECORD_HEADER.unpack_from(self.data, offset)
+
+    def _read_levels(self, offset, ask_count, bid_count):
+        start = offset + _RECORD_HEADER.size
+        end = start + (ask_count + bid_count) * 16
+        if end > self._end_offset:
+            raise InvalidOrderBookDataException('Order book record is truncated')
+        values = array('q')
+        values.frombytes(self.data[start:end])
+        if sys.byteorder != 'little':
+            values.byteswap()
+
+        split = ask_count * 2
+        ask_changes = dict(zip(values[0:split:2], values[1:split:2]))
+        bid_changes = dict(zip(values[split::2], values[split + 1::2]))
+
+        return end, ask_changes, bid_changes
+
+    def _to_book(self, record_time, asks, bids):
+        price_scale = self.price_scale
+        size_scale = self.size_scale
+        return {
+            'time': format_time(record_time / 1000),
+            'content': {
+                'asks': [
+                    {'price': price / price_scale, 'size': asks[price] / size_scale}
+                    for price in sorted(asks)
+                ],
+                'bids': [
+                    {'price': price / price_scale, 'size': bids[price] / size_scale}
+                    for price in sorted(bids, reverse=True)
+                ]
+            }
+        }
+
+
+def _get_size(level):
+    return level['size'] if 'size' in level else level['quantity']
+
+
+def _pick_scale(values):
+    largest = max((abs(float(value)) for value in values), default=0)
+    scale = _DEFAULT_SCALE
+    while (scale > 1) and (largest * scale > _MAX_FIXED_POINT):
+        scale //= 10
+
+    return scale
+
+
+def _to_fixed_point(value, scale):
+    fixed_point = int(round(float(value) * scale))
+    if abs(fixed_point) > _MAX_FIXED_POINT:
+        raise ValueError('{} does not fit in 64 bits with a scale of {}, use a smaller scale'.format(value, scale))
+
+    return fixed_point
+
+
+def _to_levels(levels, price_scale, size_scale):
+    fixed_point_levels = {}
+    for level in levels:
+        size = _to_fixed_point(_get_size(level), size_scale)
+        # A size of 0 marks removed levels in deltas
+        if size != 0:
+            fixed_point_levels[_to_fixed_point(level['price'], price_scale)] = size
+
+    return fixed_point_levels
+
+
+def _diff_levels(previous, current):
+    changes = {price: size for price, size in current.items() if previous.get(price) != size}
+    for price in previous:
+        if price not in current:
+            changes[price] = 0
+
+    return changes
+
+
+def _apply_levels(levels, changes):
+    for price, size in changes.items():
+        if size == 0:
+            levels.pop(price, None)
+        else:
+            levels[price] = size
@@ -0,0 +1,295 @@
+import math
+import threading
+from array import array
+
+
+# Quote index of prices that are already in USD
+_USD = -1
+_MAX_QUOTE_DEPTH = 4
+
+
+class PriceIndex():
+    '''
+    The Price Index keeps the tickers of several exchanges in a symbol x exchange
+    matrix of prices and precomputes, for every asset, the conversion path to a
+    single quote currency.
+
+    Valuing a portfolio is then a lookup per asset instead of a `get_ticker` call and
+    a search for a conversion route. Prices can be refreshed on a timer with `start`
+    or incrementally by passing `handle_bbo` as the handler of `bbo` websocket
+    subscriptions.
+
+    Ticker prices are stored in USD. `bbo` mid prices are stored in the quote
+    currency of their pair and resolved to USD when rates are computed, so they
+    follow later price changes of that quote currency.
+    '''
+
+    def __init__(self, client, exchanges, quote_symbol='USD'):
+        self.client = client
+        self.exchanges = list(exchanges)
+        self.quote_symbol = quote_symbol.upper()
+        self.symbols = []
+        self.lock = threading.Lock()
+        self.refresh_thread = None
+        self.stop_event = threading.Event()
+
+        self._exchange_index = {e.lower(): i for i, e in enumerate(self.exchanges)}
+        self._symbol_index = {}
+        # One column of prices per exchange, indexed by symbol. NaN marks pairs that
+        # are not listed on the exchange.
+        self._prices = [array('d') for _ in self.exchanges]
+        # The symbol index each price is quoted in, _USD for USD prices
+        self._price_quotes = [array('l') for _ in self.exchanges]
+        # Symbols that other prices are quoted in
+        self._quoted_symbols = set()
+        # Per symbol, the exchanges the asset and the quote currency are priced on
+        self._paths = []
+        self._rates = array('d')
+
+    def refresh(self, exchange=None):
+        '''
+            Reloads the tickers of one exchange, or of every exchange if none is given
+        '''
+        if exchange is None:
+            exchanges = self.exchanges
+        else:
+            # Requests use the name as configured, whatever the case of the argument
+            exchanges = [self.exchanges[self._exchange_index[exchange.lower()]]]
+
+        for e in exchanges:
+            ticker = self.client.get_ticker(e)
+            self.load_ticker(e, ticker)
+
+    def load_ticker(self, exchange, ticker):
+        '''
+            Loads a `get_ticker` response into the column of the given exchange
+        '''
+        if not isinstance(ticker, list):
+            # Error responses keep the last known prices
+            return
+
+        with self.lock:
+            exchange_index = self._exchange_index[exchange.lower()]
+            column = self._prices[exchange_index]
+            quotes = self._price_quotes[exchange_index]
+            listed = set()
+            availability_changed = False
+            for row in ticker:
+                price = row.get('priceUsd')
+                if price is None:
+                    continue
+
+                i = self._get_or_add_symbol(row['symbol'])
+                availability_changed = availability_changed or math.isnan(column[i])
+                column[i] = float(price)
+                quotes[i] = _USD
+                listed.add(i)
+
+            for i in range(len(column)):
+                if (i not in listed) and (not math.isnan(column[i])):
+                    column[i] = math.nan
+                    availability_changed = True
+
+            # Paths only change when pairs are listed or delisted, otherwise the
+            # existing paths remain valid and only the rates are recomputed
+            if availability_changed:
+                self._compute_paths()
+            self._compute_rates()
+
+    def handle_bbo(self, message):
+        '''
+            Websocket handler for the `bbo` channel. The mid price of the pair is valued
+            through the quote currency price on the same exchange.
+        '''
+        exchange_index = self._exchange_index.get(message.get('exchange', '').lower())
+        content = message.get('content', {})
+        asks = content.get('asks') or []
+        bids = content.get('bids') or []
+        if (exchange_index is None) or (not asks) or (not bids):
+            return
+
+        base_symbol, quote_symbol = message['pair'].upper().split('-')
+        mid_price = (float(asks[0]['price']) + float(bids[0]['price'])) / 2
+
+        with self.lock:
+            column = self._prices[exchange_index]
+            quotes = self._price_quotes[exchange_index]
+            quote_index = self._symbol_index.get(quote_symbol)
+            if (quote_index is None) or math.isnan(self._get_usd_price(exchange_index, quote_index)):
+                return
+
+            base_index = self._get_or_add_symbol(base_symbol)
+            previous_price = column[base_index]
+            previous_quote = quotes[base_index]
+            column[base_index] = mid_price
+            quotes[base_index] = quote_index
+            if math.isnan(self._get_usd_price(exchange_index, base_index)):
+                # The quote currency is itself priced through the base currency
+                column[base_index] = previous_price
+                quotes[base_index] = previous_quote
+                return
+            self._quoted_symbols.add(quote_index)
+
+            if math.isnan(previous_price):
+                self._compute_paths()
+                self._compute_rates()
+            elif (base_symbol == self.quote_symbol) or (base_index in self._quoted_symbols):
+                # Every price quoted in this symbol changed as well
+                self._compute_rates()
+            else:
+                self._compute_rate(base_index)
+
+    def get_rate(self, symbol):
+        '''
+            Returns the price of one unit of the symbol in the quote currency, or None
+            if no conversion path exists
+        '''
+        i = self._symbol_index.get(symbol.upper())
+        if i is None:
+            return None
+
+        rate = self._rates[i]
+        return None if math.isnan(rate) else rate
+
+    def get_path(self, symbol):
+        '''
+            Returns the (asset exchange, quote exchange) used to value the symbol
+        '''
+        i = self._symbol_index.get(symbol.upper())
+        if (i is None) or (self._paths[i] is None):
+            return None
+
+        asset_exchange, quote_exchange = self._paths[i]
+        return (self.exchanges[asset_exchange], self.exchanges[quote_exchange])
+
+    def value(self, balances):
+        '''
+            Values a portfolio in the quote currency. Balances may be a mapping of symbol
+            to amount or a list of `get_balance` entries. Assets without a conversion
+            path are ignored.
+        '''
+        if hasattr(balances, 'items'):
+            items = balances.items()
+        else:
+            items = ((b['symbol'], b['nativeValue']) for b in balances)
+
+        rates = self._rates
+        symbol_index = self._symbol_index
+        total = 0.0
+        for symbol, amount in items:
+            i = symbol_index.get(symbol.upper())
+            if (i is not None) and (not math.isnan(rates[i])):
+                total += float(amount) * rates[i]
+
+        return total
+
+    def start(self, interval=60):
+        '''
+            Refreshes every exchange on a background thread every `interval` seconds
+        '''
+        self.stop_event.clear()
+        self.refresh_thread = threading.Thread(target=self._run_refresh_thread, args=(interval,))
+        self.refresh_thread.daemon = True
+        self.refresh_thread.start()
+
+    def stop(self):
+        if self.refresh_thread is None:
+            return
+
+        self.stop_event.set()
+        self.refresh_thread.join()
+        self.refresh_thread = None
+
+    def _run_refresh_thread(self, interval):
+        while not self.stop_event.is_set():
+            for exchange in self.exchanges:
+                try:
+                    self.refresh(exchange)
+                except Exception:
+                    # A failing exchange keeps its last known prices
+                    pass
+            self.stop_event.wait(interval)
+
+    def _get_or_add_symbol(self, symbol):
+        symbol = symbol.upper()
+        i = self._symbol_index.get(symbol)
+        if i is None:
+            i = len(self.symbols)
+            self._symbol_index[symbol] = i
+            self.symbols.append(symbol)
+            for column in self._prices:
+                column.append(math.nan)
+            for quotes in self._price_quotes:
+                quotes.append(_USD)
+            self._rates.append(math.nan)
+
+        return i
+
+    def _compute_paths(self):
+        '''
+        An asset is valued on the first exchange (in the configured order) that lists
+        both the asset and the quote currency. Otherwise the asset and quote prices are
+        taken from the first exchanges that list each of them.
+        '''
+        quote_index = self._symbol_index.get(self.quote_symbol)
+        paths = []
+        for i in range(len(self.symbols)):
+            paths.append(self._find_path(i, quote_index))
+
+        self._paths = paths
+
+    def _find_path(self, i, quote_index):
+        asset_exchanges = [e for e, column in enumerate(self._prices) if not math.isnan(column[i])]
+        if not asset_exchanges:
+            return None
+
+        if self.quote_symbol == 'USD':
+            return (asset_exchanges[0], asset_exchanges[0])
+
+        if quote_index is None:
+            return None
+
+        quote_exchanges = [e for e, column in enumerate(self._prices) if not math.isnan(column[quote_index])]
+        if not quote_exchanges:
+            return None
+
+        for e in asset_exchanges:
+            if e in quote_exchanges:
+                return (e, e)
+
+        return (asset_exchanges[0], quote_exchanges[0])
+
+    def _compute_rates(self):
+        for i in range(len(self.symbols)):
+            self._compute_rate(i)
+
+    def _compute_rate(self, i):
+        path = self._paths[i]
+        if path is None:
+            self._rates[i] = math.nan
+            return
+
+        asset_exchange, quote_exchange = path
+        asset_price = self._get_usd_price(asset_exchange, i)
+        if self.quote_symbol == 'USD':
+            self._rates[i] = asset_price
+            return
+
+        quote_price = self._get_usd_price(quote_exchange, self._symbol_index[self.quote_symbol])
+        self._rates[i] = asset_price / quote_price if quote_price else math.nan
+
+    def _get_usd_price(self, exchange_index, i):
+        '''
+        Follows the quote currencies of the price until a USD price is reached. Chains
+        longer than `_MAX_QUOTE_DEPTH`, e.g. cycles, have no price.
+        '''
+        column = self._prices[exchange_index]
+        quotes = self._price_quotes[exchange_index]
+        price = 1.0
+        for _ in range(_MAX_QUOTE_DEPTH):
+            price *= column[i]
+            i = quotes[i]
+            if i == _USD:
+                return price
+
+        return math.nan
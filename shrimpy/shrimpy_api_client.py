@@ -1,19 +1,34 @@
-import requests
 import json
 from urllib.parse import urlencode
 from shrimpy.auth_provider import AuthProvider
+from shrimpy.transport import RequestsTransport
 
 
 class ShrimpyApiClient():
     """Authenticated access to the Shrimpy Developer API"""
 
-    def __init__(self, key, secret, timeout=300):
+    def __init__(self, key, secret, timeout=300, transport=None):
         self.url = 'https://dev-api.shrimpy.io/v1/'
         self.auth_provider = None
         self.timeout = timeout
         if (key and secret):
             self.auth_provider = AuthProvider(key, secret)
-        self.session = requests.Session()
+        self.transport = transport if transport is not None else RequestsTransport()
+
+    @property
+    def session(self):
+        '''
+            The `requests.Session` of the transport, or None for transports that are not
+            based on `requests`
+        '''
+        return getattr(self.transport, 'session', None)
+
+    @session.setter
+    def session(self, session):
+        if not hasattr(self.transport, 'session'):
+            raise AttributeError('{} has no requests session'.format(type(self.transport).__name__))
+
+        self.transport.session = session
 
     ##########
     # Public #
@@ -530,7 +545,7 @@ class ShrimpyApiClient():
         if data is not None:
             data = json.dumps(data)
 
-        api_request = self.session.request(
+        return self.transport.request(
             method,
             url,
             params=params,
@@ -539,7 +554,11 @@ class ShrimpyApiClient():
             timeout=self.timeout
         )
 
-        return api_request.json()
+    def warm_connections(self, connections=None):
+        '''
+            Opens the pooled connections to the API ahead of the first requests
+        '''
+        self.transport.warm(self.url, connections)
 
     def _create_query_string(self, endpoint, params):
         return endpoint + '?' + urlencode(params)
@@ -33,9 +33,24 @@ class ShrimpyWsClient():
     It provides reconnection and ping management. Errors received while streaming data
     are routed to the error callbacks defined per subscription. If no callbacks
     are defined, errors must be handled explicitly.
+
+    By default handlers run on executor threads. With `handler_processes`, they run in
+    that many worker processes instead, with all messages of a topic handled by the
+    same worker in order. Handlers must then be picklable, e.g. module level functions.
+    Each worker reads from a ring buffer of `handler_buffer_size` bytes. Messages that
+    don't fit within `handler_dispatch_timeout` seconds, because the worker is busy or
+    dead, or that are larger than the buffer are dropped and reported to the error
+    handler.
     '''
 
-    def __init__(self, error_handler=None, token=None):
+    def __init__(
+        self,
+        error_handler=None,
+        token=None,
+        handler_processes=None,
+        handler_buffer_size=4 * 1024 * 1024,
+        handler_dispatch_timeout=0
+    ):
         self.base_url = 'wss://ws-feed.shrimpy.io'
         self.subscription_handlers = {}
         self.error_handler = error_handler
@@ -46,8 +61,20 @@ class ShrimpyWsClient():
         self.connection = None
         self.connection_close_timeout = 10
         self.token = token
+        self.handler_pool = None
+        if handler_processes:
+            # Worker processes pull in multiprocessing, only import them when used
+            from shrimpy.ws_workers import ProcessHandlerPool
+            self.handler_pool = ProcessHandlerPool(
+                handler_processes,
+                buffer_size=handler_buffer_size,
+                dispatch_timeout=handler_dispatch_timeout
+            )
 
     def connect(self):
+        if (self.handler_pool != None):
+            self.handler_pool.start()
+
         self.socket_thread = threading.Thread(target=self._run_socket_thread)
         self.socket_thread.start()
 
@@ -58,6 +85,8 @@ class ShrimpyWsClient():
 
         self.is_closed = True
         self.socket_thread.join()
+        if (self.handler_pool != None):
+            self.handler_pool.stop()
 
     def subscribe(self, subscription_data, handler):
         '''
@@ -68,6 +97,8 @@ class ShrimpyWsClient():
 
         topic = self._get_topic(subscription_data)
         self.subscription_handlers[topic] = handler
+        if (self.handler_pool != None):
+            self.handler_pool.register(topic, handler)
 
     def unsubscribe(self, subscription_data):
         '''
@@ -78,6 +109,8 @@ class ShrimpyWsClient():
 
         topic = self._get_topic(subscription_data)
         del self.subscription_handlers[topic]
+        if (self.handler_pool != None):
+            self.handler_pool.unregister(topic)
 
     def _run_socket_thread(self):
         try:
@@ -149,12 +182,12 @@ class ShrimpyWsClient():
                 if (topic == 'ping'):
                     await self._pong(parsed_message['data'])
                 else:
-                    await self._run_handler(topic, parsed_message)
+                    await self._run_handler(topic, parsed_message, message)
 
             except websockets.exceptions.ConnectionClosed:
                 raise ShrimpyConnectionClosed()
 
-    async def _run_handler(self, topic, parsed_message):
+    async def _run_handler(self, topic, parsed_message, raw_message=None):
         try:
             loop = asyncio.get_event_loop()
             if (topic == 'error'):
@@ -164,7 +197,21 @@ class ShrimpyWsClient():
                     raise ShrimpyWsException(json.dumps(parsed_message))
             else:
                 subscription_handler = self.subscription_handlers[topic]
-                loop.run_in_executor(None, subscription_handler, parsed_message)
+                if (self.handler_pool != None) and (raw_message != None):
+                    # Workers decode the raw message themselves
+                    is_dispatched = self.handler_pool.dispatch(topic, raw_message)
+                    if (not is_dispatched) and (self.error_handler != None):
+                        error = {
+                            'type': 'error',
+                            'topic': topic,
+                            'message': (
+                                'Message dropped, the handler process is busy or not running, '
+                                'or the message is larger than its buffer'
+                            )
+                        }
+                        loop.run_in_executor(None, self.error_handler, error)
+                else:
+                    loop.run_in_executor(None, subscription_handler, parsed_message)
         except KeyError:
             # The client has unsubscribed from this topic
             pass
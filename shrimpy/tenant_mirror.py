@@ -0,0 +1,179 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TenantMirror():
+    '''
+    The Tenant Mirror keeps a local copy of the users, accounts, API keys and key
+    permissions of a master API key, indexed by id.
+
+    A refresh always calls `list_users`, but the accounts and keys of a user are
+    only fetched again when the user is new, its listing entry changed, or it was
+    marked with `invalidate` (e.g. after linking an account). Permissions are only
+    fetched for new keys. Subtree requests run in parallel on `max_workers` threads.
+    Failed requests keep the previous state and are retried on the next refresh.
+
+    Differences are sent to the handlers as dicts:
+
+        {
+            'type': 'added', 'removed' or 'changed',
+            'kind': 'user', 'account' or 'apiKey',
+            'userId': ...,
+            'id': ...,
+            'previous': <previous value or None>,
+            'current': <current value or None>
+        }
+
+    The value of an `apiKey` is its permissions.
+    '''
+
+    def __init__(self, client, handler=None, max_workers=8):
+        self.client = client
+        self.handlers = [] if handler is None else [handler]
+        self.max_workers = max_workers
+        self.users = {}
+        self.accounts = {}
+        self.api_keys = {}
+        self.stale_users = set()
+        self.stale_keys = set()
+        self.lock = threading.Lock()
+
+    def add_handler(self, handler):
+        self.handlers.append(handler)
+
+    def invalidate(self, user_id, public_key=None):
+        '''
+            Marks the accounts and keys of a user, or the permissions of one of its keys,
+            to be fetched again on the next refresh
+        '''
+        with self.lock:
+            self.stale_users.add(user_id)
+            if public_key is not None:
+                self.stale_keys.add((user_id, public_key))
+
+    def refresh(self, full=False):
+        '''
+            Synchronizes the mirror and returns the list of emitted events
+        '''
+        users = self.client.list_users()
+        if not isinstance(users, list):
+            # Error responses leave the mirror untouched
+            return []
+
+        current_users = {user['id']: user for user in users}
+        with self.lock:
+            stale_users, self.stale_users = self.stale_users, set()
+            stale_keys, self.stale_keys = self.stale_keys, set()
+
+        try:
+            events = self._apply(current_users, stale_users, stale_keys, full)
+        except Exception:
+            # Invalidations must survive failed refreshes
+            with self.lock:
+                self.stale_users |= stale_users
+                self.stale_keys |= stale_keys
+            raise
+
+        for event in events:
+            for handler in self.handlers:
+                handler(event)
+
+        return events
+
+    def _apply(self, current_users, stale_users, stale_keys, full):
+        events = []
+        self._diff('user', None, self.users, current_users, events)
+
+        refreshed_user_ids = [
+            user_id for user_id, user in current_users.items()
+            if full or (user_id in stale_users) or (self.users.get(user_id) != user)
+        ]
+        removed_user_ids = [user_id for user_id in self.users if user_id not in current_users]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            subtrees = list(executor.map(self._fetch_subtree, refreshed_user_ids))
+
+            permission_requests = []
+            for user_id, accounts, public_keys in subtrees:
+                known_keys = {} if full else self.api_keys.get(user_id, {})
+                permission_requests.extend(
+                    (user_id, public_key) for public_key in (public_keys or [])
+                    if (public_key not in known_keys) or ((user_id, public_key) in stale_keys)
+                )
+            permissions = dict(zip(
+                permission_requests,
+                executor.map(lambda r: self.client.get_api_key_permissions(*r), permission_requests)
+            ))
+
+        for user_id, accounts, public_keys in subtrees:
+            if accounts is not None:
+                current_accounts = {account['id']: account for account in accounts}
+                previous_accounts = self.accounts.get(user_id, {})
+                self._diff('account', user_id, previous_accounts, current_accounts, events)
+                self.accounts[user_id] = current_accounts
+
+            if public_keys is not None:
+                previous_keys = self.api_keys.get(user_id, {})
+                current_keys = {}
+                for public_key in public_keys:
+                    key_permissions = permissions.get((user_id, public_key), previous_keys.get(public_key))
+                    if not _is_permissions(key_permissions):
+                        # Failed requests keep the previous permissions and are retried
+                        with self.lock:
+                            self.stale_users.add(user_id)
+                            self.stale_keys.add((user_id, public_key))
+                        key_permissions = previous_keys.get(public_key)
+                        if key_permissions is None:
+                            continue
+                    current_keys[public_key] = key_permissions
+                self._diff('apiKey', user_id, previous_keys, current_keys, events)
+                self.api_keys[user_id] = current_keys
+
+        for user_id in removed_user_ids:
+            self._diff('account', user_id, self.accounts.pop(user_id, {}), {}, events)
+            self._diff('apiKey', user_id, self.api_keys.pop(user_id, {}), {}, events)
+
+        self.users = current_users
+
+        return events
+
+    def _fetch_subtree(self, user_id):
+        accounts = self.client.list_accounts(user_id)
+        public_keys = self.client.get_api_keys(user_id)
+
+        # Failed listings keep the previous state of the subtree
+        if not isinstance(accounts, list):
+            accounts = None
+            with self.lock:
+                self.stale_users.add(user_id)
+        if not isinstance(public_keys, list):
+            public_keys = None
+            with self.lock:
+                self.stale_users.add(user_id)
+
+        return (user_id, accounts, public_keys)
+
+    def _diff(self, kind, user_id, previous, current, events):
+        for item_id, value in current.items():
+            if item_id not in previous:
+                events.append(self._create_event('added', kind, user_id, item_id, None, value))
+            elif previous[item_id] != value:
+                events.append(self._create_event('changed', kind, user_id, item_id, previous[item_id], value))
+
+        for item_id, value in previous.items():
+            if item_id not in current:
+                events.append(self._create_event('removed', kind, user_id, item_id, value, None))
+
+    def _create_event(self, event_type, kind, user_id, item_id, previous, current):
+        return {
+            'type': event_type,
+            'kind': kind,
+            'userId': item_id if kind == 'user' else user_id,
+            'id': item_id,
+            'previous': previous,
+            'current': current
+        }
+
+
+def _is_permissions(response):
+    return isinstance(response, dict) and ('error' not in response)
@@ -0,0 +1,117 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class RequestsTransport():
+    '''
+    Default transport of the `ShrimpyApiClient`, backed by a `requests.Session`.
+
+    The connection pool is sized with `pool_connections` (number of hosts) and
+    `pool_maxsize` (connections kept alive per host). `pool_maxsize` should be at
+    least the number of threads sharing the client, otherwise connections beyond
+    the pool size are closed after each request instead of being reused.
+
+    DNS lookups and TLS handshakes are only paid when a pooled connection is opened.
+    There is no separate DNS cache or TLS session resumption.
+    '''
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, max_retries=0, pool_block=False):
+        self.pool_maxsize = pool_maxsize
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+            pool_block=pool_block
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method, url, params=None, data=None, auth=None, timeout=None):
+        response = self.session.request(
+            method,
+            url,
+            params=params,
+            data=data,
+            auth=auth,
+            timeout=timeout
+        )
+
+        return response.json()
+
+    def warm(self, url, connections=None):
+        '''
+            Opens up to `connections` keep-alive connections to the host of `url` in
+            parallel, so that the first requests reuse them instead of connecting
+        '''
+        connections = self.pool_maxsize if connections is None else connections
+        threads = [threading.Thread(target=self._warm_connection, args=(url,)) for _ in range(connections)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def close(self):
+        self.session.close()
+
+    def _warm_connection(self, url):
+        try:
+            self.session.head(url, timeout=10)
+        except requests.exceptions.RequestException:
+            # Warming is best effort, failures surface on the first real request
+            pass
+
+
+class HttpxTransport():
+    '''
+    HTTP/2 transport backed by an `httpx.Client`. Concurrent requests are multiplexed
+    over a single connection per host instead of one connection per thread.
+
+    Requires the optional `httpx[http2]` dependency. With `http1=False`, plain
+    `http://` URLs use HTTP/2 as well, e.g. for a local proxy without TLS.
+    '''
+
+    def __init__(self, http2=True, max_connections=100, max_keepalive_connections=20, http1=True):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError('HttpxTransport requires httpx, install it with `pip install httpx[http2]`')
+
+        self.client = httpx.Client(
+            http1=http1,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            )
+        )
+
+    def request(self, method, url, params=None, data=None, auth=None, timeout=None):
+        request = self.client.build_request(
+            method,
+            url,
+            params=params,
+            content=data,
+            timeout=timeout
+        )
+        if auth is not None:
+            headers = auth.get_headers(request.url.raw_path.decode('ascii'), request.method, data)
+            request.headers.update({k: str(v) for k, v in headers.items()})
+
+        response = self.client.send(request)
+
+        return response.json()
+
+    def warm(self, url, connections=None):
+        '''
+            Opens the multiplexed connection to the host of `url`
+        '''
+        try:
+            self.client.head(url, timeout=10)
+        except Exception:
+            # Warming is best effort, failures surface on the first real request
+            pass
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,32 @@
+import calendar
+import time
+from datetime import datetime
+
+
+def parse_time(value):
+    '''
+    Converts an API timestamp such as '2019-05-15T04:40:30.000Z' to seconds since
+    the epoch. Numbers are assumed to already be epoch seconds.
+    '''
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    value = value.rstrip('Z')
+    seconds, _, fraction = value.partition('.')
+    parsed = datetime.strptime(seconds, '%Y-%m-%dT%H:%M:%S')
+    timestamp = calendar.timegm(parsed.timetuple())
+    if fraction:
+        timestamp += float('0.' + fraction)
+
+    return float(timestamp)
+
+
+def format_time(timestamp):
+    '''
+    Converts seconds since the epoch to the timestamp format used by the API
+    '''
+    seconds, milliseconds = divmod(int(round(timestamp * 1000)), 1000)
+    return '{}.{:03d}Z'.format(
+        time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds)),
+        milliseconds
+    )
@@ -0,0 +1,270 @@
+import multiprocessing
+import json
+import pickle
+import threading
+import time
+import zlib
+from multiprocessing import shared_memory
+from struct import Struct
+
+
+_MESSAGE = 0
+_REGISTER = 1
+_UNREGISTER = 2
+_STOP = 3
+
+# Message records start with the length of their topic
+_TOPIC_LENGTH = Struct('<H')
+
+
+class HandlerWorkerException(Exception):
+    pass
+
+
+class SharedMemoryRing():
+    '''
+    Single producer, single consumer byte ring buffer in shared memory.
+
+    The header holds the total number of bytes written and read so far. Each side
+    only ever advances its own counter, so no lock is needed between the producer
+    and the consumer process.
+    '''
+
+    # write position, read position
+    _HEADER = Struct('<QQ')
+    _POSITION = Struct('<Q')
+    # record type, payload length
+    _RECORD = Struct('<BI')
+
+    def __init__(self, capacity, name=None):
+        self.capacity = capacity
+        self.is_owner = name is None
+        if self.is_owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=self._HEADER.size + capacity)
+            self._HEADER.pack_into(self.memory.buf, 0, 0, 0)
+        else:
+            self.memory = _attach_shared_memory(name)
+        self.name = self.memory.name
+        self.data = self.memory.buf[self._HEADER.size:self._HEADER.size + capacity]
+
+    def put(self, record_type, payload):
+        '''
+            Appends a record and returns True, or returns False without waiting if the
+            consumer hasn't freed enough space yet
+        '''
+        record = self._RECORD.pack(record_type, len(payload)) + payload
+        if len(record) > self.capacity:
+            raise ValueError('Message of {} bytes exceeds the ring buffer capacity'.format(len(payload)))
+
+        write_position, read_position = self._HEADER.unpack_from(self.memory.buf, 0)
+        if self.capacity - (write_position - read_position) < len(record):
+            return False
+
+        self._write(write_position, record)
+        # Publish the record only once its bytes are in place
+        self._POSITION.pack_into(self.memory.buf, 0, write_position + len(record))
+        return True
+
+    def get_all(self):
+        '''
+            Returns every available (record type, payload) and releases their space
+        '''
+        write_position, read_position = self._HEADER.unpack_from(self.memory.buf, 0)
+        records = []
+        while read_position < write_position:
+            record_type, length = self._RECORD.unpack(self._read(read_position, self._RECORD.size))
+            payload = self._read(read_position + self._RECORD.size, length)
+            records.append((record_type, payload))
+            read_position += self._RECORD.size + length
+
+        self._POSITION.pack_into(self.memory.buf, self._POSITION.size, read_position)
+        return records
+
+    def close(self):
+        self.data.release()
+        self.memory.close()
+        if self.is_owner:
+            self.memory.unlink()
+
+    def _write(self, position, record):
+        start = position % self.capacity
+        first = min(len(record), self.capacity - start)
+        self.data[start:start + first] = record[:first]
+        if first < len(record):
+            self.data[0:len(record) - first] = record[first:]
+
+    def _read(self, position, length):
+        start = position % self.capacity
+        first = min(length, self.capacity - start)
+        chunk = bytes(self.data[start:start + first])
+        if first < length:
+            chunk += bytes(self.data[0:length - first])
+        return chunk
+
+
+class ProcessHandlerPool():
+    '''
+    Runs websocket handlers in worker processes.
+
+    Every topic is assigned to a single worker, so messages of a pair are handled
+    in the order they were received. Messages are handed over as the raw JSON text
+    through a shared memory ring per worker and decoded in the worker, so nothing is
+    pickled per message. Handlers are pickled once when subscribing and must
+    therefore be picklable, e.g. module level functions.
+
+    `dispatch` never waits longer than `dispatch_timeout` seconds for space in the
+    ring of a worker, so a slow or dead worker can't stall the socket thread. The
+    message is dropped instead and `dispatch` returns False, as are messages larger
+    than `buffer_size`. Subscriptions wait up
+    to `timeout` seconds and raise a `HandlerWorkerException` on failure. `stop`
+    terminates the workers that haven't drained their ring within `timeout`.
+    '''
+
+    def __init__(self, processes=None, buffer_size=4 * 1024 * 1024, dispatch_timeout=0, timeout=5):
+        self.process_count = processes or multiprocessing.cpu_count()
+        self.buffer_size = buffer_size
+        self.dispatch_timeout = dispatch_timeout
+        self.timeout = timeout
+        self.context = multiprocessing.get_context('spawn')
+        self.rings = []
+        self.semaphores = []
+        self.processes = []
+        self.handlers = {}
+        # Subscriptions and the socket thread both write to the rings, which only
+        # support a single producer
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.processes:
+            return
+
+        for _ in range(self.process_count):
+            ring = SharedMemoryRing(self.buffer_size)
+            semaphore = self.context.Semaphore(0)
+            process = self.context.Process(
+                target=_run_worker,
+                args=(ring.name, self.buffer_size, semaphore)
+            )
+            process.daemon = True
+            process.start()
+            self.rings.append(ring)
+            self.semaphores.append(semaphore)
+            self.processes.append(process)
+
+        # Handlers registered before starting are replayed to their workers
+        for topic, handler in self.handlers.items():
+            self._register_in_worker(topic, handler)
+
+    def stop(self):
+        deadline = time.monotonic() + self.timeout
+        for i in range(len(self.processes)):
+            self._put_to_worker(i, _STOP, b'', deadline)
+        for process in self.processes:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                # The worker is stuck in a handler or behind on its ring
+                process.terminate()
+                process.join()
+        for ring in self.rings:
+            ring.close()
+
+        self.rings = []
+        self.semaphores = []
+        self.processes = []
+
+    def register(self, topic, handler):
+        self.handlers[topic] = handler
+        if self.processes:
+            self._register_in_worker(topic, handler)
+
+    def unregister(self, topic):
+        self.handlers.pop(topic, None)
+        if self.processes:
+            if not self._put(topic, _UNREGISTER, topic.encode('utf-8'), time.monotonic() + self.timeout):
+                raise HandlerWorkerException('Handler process of {} is not responding'.format(topic))
+
+    def dispatch(self, topic, raw_message):
+        '''
+            Hands the raw JSON text of a message to the worker owning the topic and
+            returns False if the message was dropped
+        '''
+        if isinstance(raw_message, str):
+            raw_message = raw_message.encode('utf-8')
+        try:
+            return self._put(topic, _MESSAGE, _encode_topic(topic) + raw_message, time.monotonic() + self.dispatch_timeout)
+        except ValueError:
+            # The message can never fit in the ring
+            return False
+
+    def _register_in_worker(self, topic, handler):
+        if not self._put(topic, _REGISTER, pickle.dumps((topic, handler)), time.monotonic() + self.timeout):
+            raise HandlerWorkerException('Handler process of {} is not responding'.format(topic))
+
+    def _put(self, topic, record_type, payload, deadline):
+        i = zlib.crc32(topic.encode('utf-8')) % len(self.processes)
+        return self._put_to_worker(i, record_type, payload, deadline)
+
+    def _put_to_worker(self, i, record_type, payload, deadline):
+        while True:
+            with self.lock:
+                is_written = self.rings[i].put(record_type, payload)
+            if is_written:
+                self.semaphores[i].release()
+                return True
+
+            if (time.monotonic() >= deadline) or (not self.processes[i].is_alive()):
+                return False
+            # Wait outside of the lock so that other workers keep receiving messages
+            time.sleep(0.0001)
+
+
+def _encode_topic(topic):
+    topic = topic.encode('utf-8')
+    return _TOPIC_LENGTH.pack(len(topic)) + topic
+
+
+def _attach_shared_memory(name):
+    '''
+    Attaches to a segment owned by the parent process. The segment is only unlinked
+    by its owner, workers never register it with a resource tracker of their own.
+    '''
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no `track` argument. Spawned workers share the resource
+        # tracker of the parent, where the segment is already registered.
+        return shared_memory.SharedMemory(name=name)
+
+
+def _run_worker(ring_name, buffer_size, semaphore):
+    ring = SharedMemoryRing(buffer_size, ring_name)
+    handlers = {}
+    try:
+        while True:
+            semaphore.acquire()
+            # Every record releases the semaphore once, but a single pass reads all
+            # of them, so the releases of the records read now are consumed as well
+            while semaphore.acquire(False):
+                pass
+            for record_type, payload in ring.get_all():
+                if record_type == _MESSAGE:
+                    topic_length, = _TOPIC_LENGTH.unpack_from(payload, 0)
+                    topic_end = _TOPIC_LENGTH.size + topic_length
+                    handler = handlers.get(payload[_TOPIC_LENGTH.size:topic_end].decode('utf-8'))
+                    if handler is None:
+                        # The client has unsubscribed from this topic
+                        continue
+                    try:
+                        handler(json.loads(payload[topic_end:]))
+                    except Exception:
+                        # Handler exceptions must be handled by the handler itself
+                        pass
+                elif record_type == _REGISTER:
+                    topic, handler = pickle.loads(payload)
+                    handlers[topic] = handler
+                elif record_type == _UNREGISTER:
+                    handlers.pop(payload.decode('utf-8'), None)
+                elif record_type == _STOP:
+                    return
+    finally:
+        ring.close()
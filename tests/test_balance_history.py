@@ -0,0 +1,102 @@
+import time
+
+from shrimpy.balance_history import BalanceHistoryCache, DAY, HOUR
+from shrimpy.utils import format_time, parse_time
+
+
+class FakeClient():
+
+    def __init__(self, points):
+        self.points = points
+        self.history_requests = []
+        self.balance_requests = []
+
+    def get_total_balance_history(self, user_id, exchange_account_id, start_time=None, end_time=None):
+        self.history_requests.append(start_time)
+        start = parse_time(start_time) if start_time else 0
+        return [p for p in self.points if parse_time(p['date']) >= start]
+
+    def get_balance(self, user_id, exchange_account_id, date=None):
+        self.balance_requests.append(date)
+        return {'retrievedAt': date, 'balances': []}
+
+
+def _point(timestamp, value):
+    return {'date': format_time(timestamp), 'usdValue': value, 'btcValue': value / 1000}
+
+
+def test_refresh_only_requests_new_points():
+    now = time.time()
+    client = FakeClient([_point(now - 3 * HOUR, 1), _point(now - 2 * HOUR, 2)])
+    cache = BalanceHistoryCache(client)
+
+    assert [p['usdValue'] for p in cache.get_total_balance_history('user', 1)] == [1, 2]
+
+    client.points.append(_point(now - HOUR, 3))
+    history = cache.get_total_balance_history('user', 1, start_time=format_time(now - 2 * HOUR))
+
+    assert [p['usdValue'] for p in history] == [2, 3]
+    assert client.history_requests[0] is None
+    assert parse_time(client.history_requests[1]) > now - 2 * HOUR
+
+
+def test_old_points_are_downsampled():
+    now = time.time()
+    start = (now - 10 * DAY) // DAY * DAY
+    points = [_point(start + i * 600, i) for i in range(int((now - start) // 600))]
+    cache = BalanceHistoryCache(FakeClient(points), resolutions=((7 * DAY, HOUR), (9 * DAY, DAY)))
+
+    history = cache.get_total_balance_history('user', 1)
+    times = [parse_time(p['date']) for p in history]
+
+    assert times == sorted(times)
+    assert len([t for t in times if t < now - 9 * DAY]) <= 2
+    hourly = [t for t in times if now - 9 * DAY <= t < now - 7 * DAY]
+    assert len(hourly) <= 2 * 24 + 1
+    assert len([t for t in times if t >= now - 7 * DAY]) >= 7 * 24 * 6 - 1
+
+
+def test_downsampling_only_processes_new_points():
+    now = time.time()
+    points = [_point(now - 8 * DAY + i * 600, i) for i in range(200)]
+    cache = BalanceHistoryCache(FakeClient(points))
+    cache.refresh('user', 1)
+    history = cache.histories[('user', 1)]
+    downsampled_until = list(history.downsampled_until)
+
+    cache._downsample(history, now)
+
+    assert history.downsampled_until == downsampled_until
+
+
+def test_newest_bucket_stays_open_after_removing_points():
+    start = 1000 * DAY
+    cache = BalanceHistoryCache(FakeClient([]), resolutions=((DAY, HOUR),))
+    cache.client.points = [_point(start + i * 600, i) for i in range(8)]
+    cache.refresh('user', 1)
+    history = cache.histories[('user', 1)]
+
+    assert list(history.times) == [start + 3000, start + 4200]
+
+    # A later point in the bucket of the newest one replaces it
+    cache.client.points.append(_point(start + 4800, 8))
+    cache.refresh('user', 1)
+
+    assert list(history.times) == [start + 3000, start + 4800]
+    assert list(history.usd_values) == [5, 8]
+
+
+def test_only_settled_snapshots_are_cached():
+    now = time.time()
+    client = FakeClient([_point(now - 2 * HOUR, 1)])
+    cache = BalanceHistoryCache(client)
+    cache.refresh('user', 1)
+    old_date = format_time(now - 3 * HOUR)
+    recent_date = format_time(now - HOUR)
+
+    cache.get_balance('user', 1, old_date)
+    cache.get_balance('user', 1, old_date)
+    cache.get_balance('user', 1, recent_date)
+    cache.get_balance('user', 1, recent_date)
+
+    assert client.balance_requests == [old_date, recent_date, recent_date]
@@ -0,0 +1,117 @@
+import pytest
+from shrimpy.candle_builder import CandleBuilder
+from shrimpy.utils import parse_time, format_time
+
+
+START = parse_time('2019-05-19T12:00:00.000Z')
+
+
+class FakeClient():
+
+    def __init__(self, candles):
+        self.candles = candles
+
+    def get_candles(self, exchange, base_trading_symbol, quote_trading_symbol, interval):
+        return self.candles
+
+
+def _trades(*trades):
+    return {
+        'exchange': 'binance',
+        'pair': 'btc-usdt',
+        'content': [
+            {'time': format_time(START + offset), 'price': str(price), 'quantity': str(quantity)}
+            for offset, price, quantity in trades
+        ]
+    }
+
+
+def _ohlcv(candle):
+    return (candle['open'], candle['high'], candle['low'], candle['close'], candle['volume'])
+
+
+def test_trades_are_aggregated_per_interval():
+    builder = CandleBuilder(intervals=('1m', '5m'))
+    builder.handle_trade(_trades((0, 100, 1), (10, 110, 2), (70, 90, 1)))
+
+    assert [_ohlcv(c) for c in builder.last('binance', 'btc-usdt', '1m', 5)] == [
+        (100, 110, 100, 110, 3),
+        (90, 90, 90, 90, 1)
+    ]
+    current = builder.current('Binance', 'BTC-USDT', '5m')
+    assert _ohlcv(current) == (100, 110, 90, 90, 4)
+    assert current['quoteVolume'] == pytest.approx(410)
+    assert current['time'] == '2019-05-19T12:00:00.000Z'
+
+
+def test_gaps_are_filled_at_the_previous_close():
+    builder = CandleBuilder(intervals=('1m',))
+    builder.handle_trade(_trades((0, 100, 1), (180, 120, 1)))
+
+    candles = builder.last('binance', 'btc-usdt', '1m', 5)
+    assert [_ohlcv(c) for c in candles] == [
+        (100, 100, 100, 100, 1),
+        (100, 100, 100, 100, 0),
+        (100, 100, 100, 100, 0),
+        (120, 120, 120, 120, 1)
+    ]
+    assert [c['time'][11:16] for c in candles] == ['12:00', '12:01', '12:02', '12:03']
+
+
+def test_late_trades_replace_filled_candles():
+    builder = CandleBuilder(intervals=('1m',))
+    builder.handle_trade(_trades((0, 99, 1), (180, 120, 1)))
+    builder.handle_trade(_trades((70, 50, 1)))
+
+    assert [_ohlcv(c) for c in builder.last('binance', 'btc-usdt', '1m', 4)] == [
+        (99, 99, 99, 99, 1),
+        (50, 50, 50, 50, 1),
+        (50, 50, 50, 50, 0),
+        (120, 120, 120, 120, 1)
+    ]
+
+
+def test_seeded_candles_skip_trades_before_seeding(monkeypatch):
+    client = FakeClient([
+        {'time': format_time(START + 60), 'open': '101', 'high': '105', 'low': '100', 'close': '104', 'volume': '3'},
+        {'time': format_time(START), 'open': '100', 'high': '102', 'low': '99', 'close': '101', 'volume': '2'}
+    ])
+    monkeypatch.setattr('shrimpy.candle_builder.time.time', lambda: START + 90)
+    builder = CandleBuilder(intervals=('1m',))
+    builder.seed(client, 'binance', 'btc', 'usdt')
+
+    # The first trade is already part of the seeded candle
+    builder.handle_trade(_trades((80, 200, 1), (100, 106, 1)))
+
+    assert [_ohlcv(c) for c in builder.last('binance', 'btc-usdt', '1m', 5)] == [
+        (100, 102, 99, 101, 2),
+        (101, 106, 100, 106, 4)
+    ]
+
+
+def test_ring_buffer_wraps_around():
+    builder = CandleBuilder(intervals=('1m',), history=3)
+    builder.handle_trade(_trades(*((60 * i, 100 + i, 1) for i in range(5))))
+
+    candles = builder.last('binance', 'btc-usdt', '1m', 10)
+    assert [c['close'] for c in candles] == [102, 103, 104]
+    assert [c['time'][11:16] for c in candles] == ['12:02', '12:03', '12:04']
+
+    # Candles that fell out of the buffer are ignored
+    builder.handle_trade(_trades((0, 1, 1)))
+    assert builder.last('binance', 'btc-usdt', '1m', 10) == candles
+
+    # Gaps longer than the buffer only keep the newest candles
+    builder.handle_trade(_trades((60 * 10, 110, 1)))
+    candles = builder.last('binance', 'btc-usdt', '1m', 10)
+    assert [_ohlcv(c) for c in candles] == [
+        (104, 104, 104, 104, 0),
+        (104, 104, 104, 104, 0),
+        (110, 110, 110, 110, 1)
+    ]
+    assert [c['time'][11:16] for c in candles] == ['12:08', '12:09', '12:10']
+
+
+def test_unsupported_interval():
+    with pytest.raises(ValueError):
+        CandleBuilder(intervals=('2m',))
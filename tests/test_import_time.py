@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time of the package itself, in microseconds
+IMPORT_TIME_BUDGET = 20000
+
+
+def _run(code, *options):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    return subprocess.run(
+        [sys.executable, *options, '-c', code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+
+def test_cold_import_stays_within_budget():
+    result = _run('import shrimpy', '-X', 'importtime')
+
+    cumulative_times = [
+        int(line.split('|')[1])
+        for line in result.stderr.splitlines()
+        if line.startswith('import time:') and (line.split('|')[2].strip() == 'shrimpy')
+    ]
+
+    assert len(cumulative_times) == 1
+    assert cumulative_times[0] < IMPORT_TIME_BUDGET
+
+
+def test_import_does_not_load_dependencies():
+    result = _run(
+        'import sys, shrimpy\n'
+        'print(" ".join(m for m in ("requests", "websockets", "multiprocessing.shared_memory") if m in sys.modules))'
+    )
+
+    assert result.stdout.strip() == ''
+
+
+def test_rest_client_does_not_load_websockets():
+    result = _run(
+        'import sys, shrimpy\n'
+        'shrimpy.ShrimpyApiClient\n'
+        'print("websockets" in sys.modules, "requests" in sys.modules)'
+    )
+
+    assert result.stdout.split() == ['False', 'True']
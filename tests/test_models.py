@@ -0,0 +1,127 @@
+import json
+import tracemalloc
+
+from shrimpy.models import Balance, LimitOrder, TradeStatus, decimal_number
+
+
+def _balances(count):
+    return json.dumps([
+        {
+            'symbol': 'BTC',
+            'nativeValue': '{}.12345678'.format(i),
+            'btcValue': '{}.12345678'.format(i),
+            'usdValue': '{}.1234'.format(i * 7000)
+        }
+        for i in range(count)
+    ])
+
+
+def _traced_size(build):
+    tracemalloc.start()
+    try:
+        value = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    return value, size
+
+
+def test_fields_are_decoded_lazily():
+    balance = Balance.from_api({'symbol': 'BTC', 'nativeValue': '1.5', 'usdValue': 15000})
+
+    assert balance.symbol == 'BTC'
+    assert balance.native_value == 1.5
+    assert balance.usd_value == 15000.0
+    assert balance.btc_value is None
+
+
+def test_get_api_format_returns_values_as_received():
+    response = {'id': 12, 'baseSymbol': 'LTC', 'price': '0.01000000', 'exchangeApiErrors': []}
+    order = LimitOrder.from_api(response)
+
+    assert order.price == 0.01
+    assert order.get_api_format() == response
+
+
+def test_trade_status_round_trip():
+    response = {
+        'trade': {'id': 'a', 'amount': '2', 'status': 'completed'},
+        'changes': [{'symbol': 'BTC', 'nativeValue': '-1'}],
+        'fills': [{'price': '3', 'side': 'BUY'}]
+    }
+    status = TradeStatus.from_api(response)
+
+    assert status.trade.amount == 2.0
+    assert status.changes[0].native_value == -1.0
+    assert status.fills[0].price == 3.0
+    assert status.get_api_format() == response
+
+
+def test_models_are_unhashable():
+    order = LimitOrder.from_api({'id': 1, 'exchangeApiErrors': []})
+
+    try:
+        hash(order)
+    except TypeError:
+        pass
+    else:
+        raise AssertionError('models must not be hashable')
+
+
+def test_subclass_inherits_fields():
+    class MyBalance(Balance):
+        pass
+
+    balance = MyBalance.from_api({'symbol': 'ETH', 'usdValue': '200'})
+
+    assert balance.symbol == 'ETH'
+    assert balance.usd_value == 200.0
+    assert balance.get_api_format() == {'symbol': 'ETH', 'usdValue': '200'}
+
+
+def test_subclass_extends_fields():
+    class ExtendedBalance(Balance):
+        __slots__ = ()
+        _fields = (
+            ('extra', 'extra', None),
+        )
+
+    balance = ExtendedBalance.from_api({'symbol': 'ETH', 'usdValue': '200', 'extra': 'x'})
+
+    assert balance.symbol == 'ETH'
+    assert balance.usd_value == 200.0
+    assert balance.extra == 'x'
+    assert balance.get_api_format() == {'symbol': 'ETH', 'usdValue': '200', 'extra': 'x'}
+    assert repr(balance) == "ExtendedBalance(symbol='ETH', usd_value='200', extra='x')"
+
+
+def test_decimal_number():
+    assert decimal_number('0.5') == 0.5
+    assert decimal_number(5) == 5.0
+    assert decimal_number('') is None
+    assert decimal_number(None) is None
+
+
+def test_memory_compared_to_dicts():
+    '''
+    Memory benchmark: models must stay smaller than the dicts they replace, even
+    after every numeric field has been decoded.
+    '''
+    raw = _balances(20000)
+
+    dicts, dict_size = _traced_size(lambda: json.loads(raw))
+    del dicts
+
+    def build_models():
+        models = Balance.from_api_list(json.loads(raw))
+        for model in models:
+            model.native_value
+            model.btc_value
+            model.usd_value
+        return models
+
+    models, model_size = _traced_size(build_models)
+    del models
+
+    assert model_size < dict_size
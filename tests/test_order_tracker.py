@@ -0,0 +1,126 @@
+from shrimpy.order_tracker import OrderTracker
+
+
+class FakeClient():
+
+    def __init__(self):
+        self.active_trades = []
+        self.open_orders = []
+        self.trade_statuses = {}
+        self.order_statuses = {}
+        self.calls = []
+
+    def list_active_trades(self, user_id, exchange_account_id):
+        self.calls.append('list_active_trades')
+        return self.active_trades
+
+    def list_open_orders(self, user_id, exchange_account_id):
+        self.calls.append('list_open_orders')
+        return self.open_orders
+
+    def get_trade_status(self, user_id, exchange_account_id, trade_id):
+        self.calls.append(('get_trade_status', trade_id))
+        return self.trade_statuses.get(trade_id, {'error': 'not found'})
+
+    def get_limit_order_status(self, user_id, exchange_account_id, order_id):
+        self.calls.append(('get_limit_order_status', order_id))
+        return self.order_statuses.get(order_id, {'error': 'not found'})
+
+
+def _poll_now(tracker):
+    for account in tracker.accounts.values():
+        account.next_poll = 0
+    tracker.poll()
+
+
+def test_polls_per_account_and_fetches_finished_items():
+    client = FakeClient()
+    client.active_trades = [{'id': 1, 'status': 'started'}, {'id': 2, 'status': 'queued'}]
+    client.open_orders = [{'id': 'o1', 'status': 'open'}]
+    events = []
+    tracker = OrderTracker(client, events.append)
+    tracker.track_trade('user', 5, 1, 'queued')
+    tracker.track_trade('user', 5, 2, 'queued')
+    tracker.track_order('user', 5, 'o1', 'open')
+
+    _poll_now(tracker)
+
+    assert client.calls == ['list_active_trades', 'list_open_orders']
+    assert [(e['id'], e['previousStatus'], e['status']) for e in events] == [(1, 'queued', 'started')]
+
+    client.active_trades = [{'id': 2, 'status': 'queued'}]
+    client.open_orders = []
+    client.trade_statuses[1] = {'trade': {'id': 1, 'status': 'completed'}}
+    client.order_statuses['o1'] = {'order': {'id': 'o1', 'status': 'cancelled'}}
+    _poll_now(tracker)
+
+    assert [(e['type'], e['id'], e['status']) for e in events[1:]] == [
+        ('trade', 1, 'completed'),
+        ('order', 'o1', 'cancelled')
+    ]
+    assert tracker.accounts[('user', 5)].trades == {2: 'queued'}
+    assert tracker.accounts[('user', 5)].orders == {}
+
+
+def test_unknown_ids_are_untracked_after_max_status_failures():
+    client = FakeClient()
+    events = []
+    tracker = OrderTracker(client, events.append, max_status_failures=2)
+    tracker.track_trade('user', 5, 'bad-id', 'queued')
+
+    _poll_now(tracker)
+    assert events == []
+
+    _poll_now(tracker)
+    assert [(e['id'], e['status']) for e in events] == [('bad-id', 'unknown')]
+    assert tracker.accounts == {}
+    assert client.calls.count(('get_trade_status', 'bad-id')) == 2
+
+
+def test_unlisted_items_stay_tracked_until_terminal():
+    client = FakeClient()
+    client.order_statuses['o1'] = {'order': {'id': 'o1', 'status': 'open'}}
+    events = []
+    tracker = OrderTracker(client, events.append)
+    tracker.track_order('user', 5, 'o1')
+
+    # The order was placed but isn't listed by list_open_orders yet
+    _poll_now(tracker)
+
+    assert [(e['id'], e['status']) for e in events] == [('o1', 'open')]
+    assert tracker.accounts[('user', 5)].orders == {'o1': 'open'}
+
+    client.order_statuses['o1'] = {'order': {'id': 'o1', 'status': 'completed'}}
+    _poll_now(tracker)
+
+    assert [(e['id'], e['status']) for e in events[1:]] == [('o1', 'completed')]
+    assert tracker.accounts == {}
+
+
+def test_quiet_accounts_back_off(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('shrimpy.order_tracker.time.time', lambda: now[0])
+    client = FakeClient()
+    client.active_trades = [{'id': 1, 'status': 'started'}]
+    tracker = OrderTracker(client, min_interval=1, max_interval=60)
+    tracker.track_trade('user', 5, 1, 'started')
+    account = tracker.accounts[('user', 5)]
+
+    # Young items keep the interval short
+    tracker.poll()
+    assert account.interval == 1
+
+    intervals = []
+    now[0] += 1000
+    for _ in range(8):
+        now[0] = max(now[0], account.next_poll)
+        tracker.poll()
+        intervals.append(account.interval)
+
+    assert intervals == [2, 4, 8, 16, 32, 60, 60, 60]
+
+    # A change resets the interval
+    client.active_trades = [{'id': 1, 'status': 'queued'}]
+    now[0] = account.next_poll
+    tracker.poll()
+    assert account.interval == 1
@@ -0,0 +1,86 @@
+import pytest
+from shrimpy.orderbook_codec import encode_orderbooks, OrderBookDecoder, InvalidOrderBookDataException
+from shrimpy.orderbook_codec import _HEADER, _INDEX_ENTRY
+
+
+def _snapshot(time, asks, bids):
+    return {
+        'time': time,
+        'content': {
+            'asks': [{'price': str(price), 'size': str(size)} for price, size in asks],
+            'bids': [{'price': str(price), 'size': str(size)} for price, size in bids]
+        }
+    }
+
+
+def _levels(book, side):
+    return [(level['price'], level['size']) for level in book['content'][side]]
+
+
+SNAPSHOTS = [
+    _snapshot('2019-05-19T12:00:00.000Z', [(101, 1), (102, 2)], [(100, 1), (99, 3)]),
+    _snapshot('2019-05-19T12:01:00.000Z', [(101, 0.5), (102, 2)], [(100, 1)]),
+    _snapshot('2019-05-19T12:02:00.000Z', [(102, 2), (103, 4)], [(100, 1), (98, 1)]),
+    _snapshot('2019-05-19T12:03:00.000Z', [(103, 4)], [(98, 1)]),
+    _snapshot('2019-05-19T12:04:00.000Z', [(103, 5)], []),
+]
+
+
+def test_round_trip_with_keyframe_seeking():
+    decoder = OrderBookDecoder(encode_orderbooks(SNAPSHOTS, keyframe_interval=2))
+
+    assert len(decoder) == 5
+    assert [book['time'] for book in decoder] == [s['time'] for s in SNAPSHOTS]
+
+    # Seeks to the keyframe at 12:02 and applies the delta of 12:03
+    book = decoder.book_at('2019-05-19T12:03:30.000Z')
+    assert book['time'] == '2019-05-19T12:03:00.000Z'
+    assert _levels(book, 'asks') == [(103, 4)]
+    assert _levels(book, 'bids') == [(98, 1)]
+
+    # Removed levels and changed sizes from a delta record
+    book = decoder.book_at('2019-05-19T12:01:00.000Z')
+    assert _levels(book, 'asks') == [(101, 0.5), (102, 2)]
+    assert _levels(book, 'bids') == [(100, 1)]
+
+    assert _levels(decoder.book_at('2019-05-20T00:00:00.000Z'), 'bids') == []
+
+
+def test_book_before_first_snapshot():
+    decoder = OrderBookDecoder(encode_orderbooks(SNAPSHOTS))
+
+    assert decoder.book_at('2019-05-19T11:59:59.999Z') is None
+
+
+def test_scales_are_picked_from_the_data():
+    snapshots = [_snapshot('2019-05-19T12:00:00.000Z', [(0.00000123, 500000000000)], [(0.00000122, 1)])]
+    decoder = OrderBookDecoder(encode_orderbooks(snapshots))
+
+    assert decoder.size_scale == 10 ** 7
+    assert decoder.price_scale == 10 ** 8
+    book = decoder.book_at('2019-05-19T12:00:00.000Z')
+    assert _levels(book, 'asks') == [(0.00000123, 500000000000)]
+
+    with pytest.raises(ValueError):
+        encode_orderbooks(snapshots, price_scale=10 ** 8, size_scale=10 ** 8)
+
+
+def test_corrupt_data():
+    data = encode_orderbooks(SNAPSHOTS, keyframe_interval=2)
+
+    with pytest.raises(InvalidOrderBookDataException):
+        OrderBookDecoder(b'XXXX' + data[4:])
+    with pytest.raises(InvalidOrderBookDataException):
+        OrderBookDecoder(data[:-1])
+
+    # An index offset pointing into the first record cuts it short
+    magic, version, price_scale, size_scale, record_count, _, _ = _HEADER.unpack_from(data, 0)
+    header = _HEADER.pack(magic, version, price_scale, size_scale, record_count, 0, _HEADER.size + 30)
+    decoder = OrderBookDecoder(header + data[_HEADER.size:])
+    with pytest.raises(InvalidOrderBookDataException):
+        list(decoder)
+
+    # Keyframe offsets outside of the records
+    header = _HEADER.pack(magic, version, price_scale, size_scale, record_count, 1, len(data) - 16)
+    with pytest.raises(InvalidOrderBookDataException):
+        OrderBookDecoder(header + data[_HEADER.size:-16] + _INDEX_ENTRY.pack(0, len(data)))
@@ -0,0 +1,111 @@
+import pytest
+from shrimpy.price_index import PriceIndex
+
+
+class FakeClient():
+
+    def __init__(self):
+        self.tickers = {
+            'binance': [
+                {'symbol': 'BTC', 'priceUsd': '10000'},
+                {'symbol': 'ETH', 'priceUsd': '600'},
+                {'symbol': 'USDT', 'priceUsd': '1'},
+            ],
+            'kucoin': [
+                {'symbol': 'BTC', 'priceUsd': '10100'},
+                {'symbol': 'KCS', 'priceUsd': '2'},
+            ]
+        }
+        self.calls = []
+
+    def get_ticker(self, exchange):
+        self.calls.append(exchange)
+        return self.tickers[exchange]
+
+
+def _bbo(exchange, pair, bid, ask):
+    return {
+        'exchange': exchange,
+        'pair': pair,
+        'content': {
+            'bids': [{'price': str(bid), 'quantity': '1'}],
+            'asks': [{'price': str(ask), 'quantity': '1'}]
+        }
+    }
+
+
+def test_paths_prefer_exchanges_listing_asset_and_quote():
+    index = PriceIndex(FakeClient(), ['binance', 'kucoin'], quote_symbol='BTC')
+    index.refresh()
+
+    assert index.get_path('ETH') == ('binance', 'binance')
+    # KCS is only listed on kucoin, BTC on both
+    assert index.get_path('KCS') == ('kucoin', 'kucoin')
+    assert index.get_rate('ETH') == pytest.approx(0.06)
+    assert index.get_rate('KCS') == pytest.approx(2 / 10100)
+    assert index.get_path('DOGE') is None
+    assert index.get_rate('DOGE') is None
+
+
+def test_paths_mix_exchanges_when_none_lists_both():
+    client = FakeClient()
+    client.tickers['kucoin'] = [{'symbol': 'KCS', 'priceUsd': '2'}]
+    client.tickers['binance'] = [{'symbol': 'USDT', 'priceUsd': '1'}]
+    index = PriceIndex(client, ['binance', 'kucoin'], quote_symbol='USDT')
+    index.refresh()
+
+    assert index.get_path('KCS') == ('kucoin', 'binance')
+    assert index.get_rate('KCS') == pytest.approx(2)
+
+
+def test_bbo_prices_follow_their_quote_currency():
+    index = PriceIndex(FakeClient(), ['binance'], quote_symbol='BTC')
+    index.refresh()
+
+    index.handle_bbo(_bbo('binance', 'eth-btc', 0.059, 0.061))
+    assert index.get_rate('ETH') == pytest.approx(0.06)
+
+    index.handle_bbo(_bbo('binance', 'btc-usdt', 11999, 12001))
+    assert index.get_rate('ETH') == pytest.approx(0.06)
+    assert index.get_rate('USDT') == pytest.approx(1 / 12000)
+
+    index.handle_bbo(_bbo('binance', 'xrp-eth', 0.0009, 0.0011))
+    assert index.get_path('XRP') == ('binance', 'binance')
+    assert index.get_rate('XRP') == pytest.approx(0.001 * 0.06)
+
+
+def test_bbo_ignores_unknown_quotes_and_cycles():
+    index = PriceIndex(FakeClient(), ['binance'])
+    index.refresh()
+
+    index.handle_bbo(_bbo('binance', 'eth-doge', 1, 1))
+    index.handle_bbo(_bbo('binance', 'btc-usdt', 11999, 12001))
+    index.handle_bbo(_bbo('binance', 'usdt-btc', 0.0001, 0.0001))
+
+    assert index.get_rate('ETH') == pytest.approx(600)
+    assert index.get_rate('BTC') == pytest.approx(12000)
+    assert index.get_rate('USDT') == pytest.approx(1)
+
+
+def test_value():
+    index = PriceIndex(FakeClient(), ['binance'])
+    index.refresh()
+
+    assert index.value({'btc': 0.5, 'ETH': '2', 'DOGE': 100}) == pytest.approx(6200)
+    assert index.value([
+        {'symbol': 'BTC', 'nativeValue': 1},
+        {'symbol': 'USDT', 'nativeValue': 50}
+    ]) == pytest.approx(10050)
+
+
+def test_refresh_errors_and_exchange_names():
+    client = FakeClient()
+    index = PriceIndex(client, ['binance'])
+    index.refresh('Binance')
+
+    assert client.calls == ['binance']
+
+    client.tickers['binance'] = {'error': 'rate limited'}
+    index.refresh()
+
+    assert index.get_rate('BTC') == pytest.approx(10000)
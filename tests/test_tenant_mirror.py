@@ -0,0 +1,108 @@
+import pytest
+from shrimpy.tenant_mirror import TenantMirror
+
+
+class FakeClient():
+
+    def __init__(self):
+        self.users = [{'id': 'u1', 'name': 'alice'}]
+        self.accounts = {'u1': [{'id': 1, 'exchange': 'binance'}]}
+        self.api_keys = {'u1': ['key1']}
+        self.permissions = {('u1', 'key1'): {'account': True, 'trade': False}}
+        self.calls = []
+
+    def list_users(self):
+        self.calls.append('list_users')
+        return self.users
+
+    def list_accounts(self, user_id):
+        self.calls.append(('list_accounts', user_id))
+        return self.accounts[user_id]
+
+    def get_api_keys(self, user_id):
+        self.calls.append(('get_api_keys', user_id))
+        return self.api_keys[user_id]
+
+    def get_api_key_permissions(self, user_id, public_key):
+        self.calls.append(('get_api_key_permissions', user_id, public_key))
+        permissions = self.permissions[(user_id, public_key)]
+        if isinstance(permissions, Exception):
+            raise permissions
+        return permissions
+
+
+def test_only_changed_subtrees_are_fetched():
+    client = FakeClient()
+    events = []
+    mirror = TenantMirror(client, events.append)
+
+    mirror.refresh()
+
+    assert [(e['type'], e['kind'], e['id']) for e in events] == [
+        ('added', 'user', 'u1'),
+        ('added', 'account', 1),
+        ('added', 'apiKey', 'key1')
+    ]
+
+    client.calls = []
+    assert mirror.refresh() == []
+    assert client.calls == ['list_users']
+
+    client.api_keys['u1'] = ['key1', 'key2']
+    client.permissions[('u1', 'key2')] = {'account': True, 'trade': True}
+    mirror.invalidate('u1')
+    client.calls = []
+    events = mirror.refresh()
+
+    assert ('get_api_key_permissions', 'u1', 'key1') not in client.calls
+    assert [(e['type'], e['kind'], e['id']) for e in events] == [('added', 'apiKey', 'key2')]
+
+
+def test_failed_permissions_keep_previous_value_and_are_retried():
+    client = FakeClient()
+    mirror = TenantMirror(client)
+    mirror.refresh()
+
+    client.permissions[('u1', 'key1')] = {'error': 'rate limited'}
+    mirror.invalidate('u1', 'key1')
+
+    assert mirror.refresh() == []
+    assert mirror.api_keys['u1'] == {'key1': {'account': True, 'trade': False}}
+    assert mirror.stale_keys == {('u1', 'key1')}
+
+    client.permissions[('u1', 'key1')] = {'account': True, 'trade': True}
+    events = mirror.refresh()
+
+    assert [(e['type'], e['current']) for e in events] == [('changed', {'account': True, 'trade': True})]
+    assert mirror.stale_keys == set()
+
+
+def test_failed_permissions_of_new_keys_are_not_added():
+    client = FakeClient()
+    client.permissions[('u1', 'key1')] = {'error': 'rate limited'}
+    mirror = TenantMirror(client)
+
+    events = mirror.refresh()
+
+    assert 'apiKey' not in [e['kind'] for e in events]
+    assert mirror.api_keys['u1'] == {}
+
+    client.permissions[('u1', 'key1')] = {'account': True, 'trade': False}
+    events = mirror.refresh()
+
+    assert [(e['type'], e['kind'], e['id']) for e in events] == [('added', 'apiKey', 'key1')]
+
+
+def test_invalidations_survive_failed_refreshes():
+    client = FakeClient()
+    mirror = TenantMirror(client)
+    mirror.refresh()
+
+    client.permissions[('u1', 'key1')] = ConnectionError('connection reset')
+    mirror.invalidate('u1', 'key1')
+
+    with pytest.raises(ConnectionError):
+        mirror.refresh()
+
+    assert mirror.stale_users == {'u1'}
+    assert mirror.stale_keys == {('u1', 'key1')}
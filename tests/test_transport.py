@@ -0,0 +1,77 @@
+import base64
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+from shrimpy.shrimpy_api_client import ShrimpyApiClient
+from shrimpy.transport import RequestsTransport
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, dict(self.headers)))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    RecordingHandler.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RecordingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield 'http://127.0.0.1:{}/v1/'.format(server.server_port)
+    server.shutdown()
+
+
+def _create_client(url, transport=None):
+    client = ShrimpyApiClient('key', base64.b64encode(b'secret').decode('ascii'), transport=transport)
+    client.url = url
+    return client
+
+
+def test_requests_transport_signs_requests(server_url):
+    client = _create_client(server_url, RequestsTransport(pool_maxsize=4))
+
+    assert client.get_ticker('binance') == {'ok': True}
+    path, headers = RecordingHandler.requests[0]
+    assert path == '/v1/exchanges/binance/ticker'
+    assert headers['DEV-SHRIMPY-API-KEY'] == 'key'
+    assert 'DEV-SHRIMPY-API-SIGNATURE' in headers
+
+
+def test_session_forwards_to_transport(server_url):
+    client = _create_client(server_url)
+    session = requests.Session()
+    session.headers['X-Custom'] = 'yes'
+
+    client.session = session
+    client.get_supported_exchanges()
+
+    assert client.transport.session is session
+    assert RecordingHandler.requests[0][1]['X-Custom'] == 'yes'
+
+
+def test_httpx_transport_signs_requests(server_url):
+    pytest.importorskip('httpx')
+    from shrimpy.transport import HttpxTransport
+    client = _create_client(server_url, HttpxTransport(http2=False))
+
+    assert client.get_candles('binance', 'LTC', 'BTC', '1m') == {'ok': True}
+    path, headers = RecordingHandler.requests[0]
+    assert path == '/v1/exchanges/binance/candles?baseTradingSymbol=LTC&quoteTradingSymbol=BTC&interval=1m'
+    assert 'DEV-SHRIMPY-API-SIGNATURE' in headers
+    assert client.session is None
+    with pytest.raises(AttributeError):
+        client.session = requests.Session()
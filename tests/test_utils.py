@@ -0,0 +1,14 @@
+from shrimpy.utils import parse_time, format_time
+
+
+def test_parse_time():
+    assert parse_time('2019-05-19T12:00:00.000Z') == 1558267200.0
+    assert parse_time('2019-05-19T12:00:00.250Z') == 1558267200.25
+    assert parse_time('2019-05-19T12:00:00Z') == 1558267200.0
+    assert parse_time(1558267200) == 1558267200.0
+
+
+def test_format_time():
+    assert format_time(1558267200.25) == '2019-05-19T12:00:00.250Z'
+    assert format_time(1558267200.9996) == '2019-05-19T12:00:01.000Z'
+    assert parse_time(format_time(1558267200.123)) == 1558267200.123
@@ -0,0 +1,118 @@
+import functools
+import json
+import os
+import subprocess
+import sys
+import time
+from shrimpy.ws_workers import ProcessHandlerPool, SharedMemoryRing, _MESSAGE
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write_message(path, message):
+    with open(path, 'a') as f:
+        f.write(json.dumps(message) + '\n')
+
+
+def _sleep(message):
+    time.sleep(60)
+
+
+def _wait_for_lines(path, count, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(path):
+            with open(path) as f:
+                lines = f.read().splitlines()
+            if len(lines) >= count:
+                return lines
+        time.sleep(0.01)
+    return []
+
+
+def test_ring_put_does_not_wait_when_full():
+    ring = SharedMemoryRing(64)
+    try:
+        assert ring.put(_MESSAGE, b'x' * 40)
+        assert not ring.put(_MESSAGE, b'x' * 40)
+
+        assert ring.get_all() == [(_MESSAGE, b'x' * 40)]
+        assert ring.put(_MESSAGE, b'x' * 40)
+    finally:
+        ring.close()
+
+
+def test_messages_are_handled_in_order(tmp_path):
+    path = str(tmp_path / 'messages')
+    pool = ProcessHandlerPool(processes=2)
+    pool.register('btc-usd', functools.partial(_write_message, path))
+    pool.start()
+    try:
+        for i in range(100):
+            assert pool.dispatch('btc-usd', json.dumps({'sequence': i}))
+
+        lines = _wait_for_lines(path, 100)
+        assert [json.loads(line)['sequence'] for line in lines] == list(range(100))
+    finally:
+        pool.stop()
+
+
+def test_dispatch_drops_messages_of_dead_workers():
+    pool = ProcessHandlerPool(processes=1, buffer_size=1024)
+    pool.start()
+    pool.processes[0].terminate()
+    pool.processes[0].join()
+
+    start = time.monotonic()
+    results = [pool.dispatch('btc-usd', '{"sequence": 0}') for _ in range(100)]
+
+    assert False in results
+    assert time.monotonic() - start < 1
+
+    pool.stop()
+
+
+def test_stop_terminates_busy_workers():
+    pool = ProcessHandlerPool(processes=1, buffer_size=1024, timeout=0.5)
+    pool.register('btc-usd', _sleep)
+    pool.start()
+    pool.dispatch('btc-usd', '{}')
+
+    start = time.monotonic()
+    pool.stop()
+
+    assert time.monotonic() - start < 5
+    assert pool.processes == []
+
+
+def test_ws_client_only_imports_workers_when_used():
+    code = (
+        'import sys, shrimpy\n'
+        'shrimpy.ShrimpyWsClient()\n'
+        'print("shrimpy.ws_workers" in sys.modules, "multiprocessing" in sys.modules)'
+    )
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+    assert result.stdout.split() == ['False', 'False']
+
+
+def test_dispatch_drops_oversized_messages():
+    pool = ProcessHandlerPool(processes=1, buffer_size=1024)
+    pool.start()
+    try:
+        assert not pool.dispatch('btc-usd', '"' + 'x' * 2000 + '"')
+        assert pool.dispatch('btc-usd', '{}')
+    finally:
+        pool.stop()
+
+
+def test_ws_client_forwards_pool_options():
+    from shrimpy.shrimpy_ws_client import ShrimpyWsClient
+    client = ShrimpyWsClient(handler_processes=2, handler_buffer_size=1024, handler_dispatch_timeout=0.01)
+
+    assert client.handler_pool.process_count == 2
+    assert client.handler_pool.buffer_size == 1024
+    assert client.handler_pool.dispatch_timeout == 0.01